@@ -0,0 +1,201 @@
+import queue
+import sqlite3
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Dedup store for alerted post links. Lookups are a dict hit; expiry is handled
+# lazily from the front of a deque that is ordered by expiry time, so each link
+# is evicted at most once (amortised O(1) per operation).
+
+DEFAULT_MAX_ENTRIES = 10_000
+MAX_WRITE_BATCH = 256
+
+
+class SQLiteWriter:
+    # Fire-and-forget writes for small bookkeeping tables (alerted links, listing
+    # cursors). Callers on the event loop only enqueue; one thread folds whatever
+    # is pending into a single transaction, like the journal's writer.
+    _STOP = object()
+
+    def __init__(self, db_path: Path, name: str = "sqlite-writer", max_batch: int = MAX_WRITE_BATCH):
+        self.db_path = Path(db_path)
+        self.max_batch = max_batch
+        self._writes: "queue.Queue" = queue.Queue()
+        self._thread = threading.Thread(target=self._write_loop, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, sql: str, rows: Sequence[tuple]) -> None:
+        self._writes.put((sql, list(rows)))
+
+    def flush(self) -> None:
+        # Blocks until everything submitted so far is committed
+        self._writes.join()
+
+    def _write_loop(self) -> None:
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        try:
+            while True:
+                item = self._writes.get()
+                if item is self._STOP:
+                    self._writes.task_done()
+                    return
+                batch = [item]
+                stop = False
+                while len(batch) < self.max_batch:
+                    try:
+                        item = self._writes.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is self._STOP:
+                        stop = True
+                        break
+                    batch.append(item)
+                # Consecutive writes of the same statement share one executemany
+                ops: List[Tuple[str, List[tuple]]] = []
+                for sql, rows in batch:
+                    if ops and ops[-1][0] == sql:
+                        ops[-1][1].extend(rows)
+                    else:
+                        ops.append((sql, rows))
+                try:
+                    with conn:
+                        for sql, rows in ops:
+                            conn.executemany(sql, rows)
+                except Exception as e:
+                    print(f"{self.db_path} write failed: {e}")
+                for _ in range(len(batch) + stop):
+                    self._writes.task_done()
+                if stop:
+                    return
+        finally:
+            conn.close()
+
+    def close(self) -> None:
+        # Pending writes ahead of the sentinel are still committed
+        if self._thread.is_alive():
+            self._writes.put(self._STOP)
+            self._thread.join()
+
+
+class SQLiteAlertBackend:
+    # Persists alerted links so a restart doesn't re-ping posts still inside the TTL
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS alerted (
+                link TEXT PRIMARY KEY,
+                expires_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+        # Adds and discards happen on the event loop; commit them elsewhere
+        self._writer = SQLiteWriter(self.db_path, name="alert-writer")
+
+    def load(self, now: float) -> Iterable[Tuple[str, float]]:
+        with self._conn:
+            self._conn.execute("DELETE FROM alerted WHERE expires_at <= ?", (now,))
+        cur = self._conn.execute("SELECT link, expires_at FROM alerted ORDER BY expires_at")
+        return cur.fetchall()
+
+    def add(self, link: str, expires_at: float) -> None:
+        self._writer.submit("INSERT OR REPLACE INTO alerted (link, expires_at) VALUES (?, ?)", [(link, expires_at)])
+
+    def discard(self, links: Iterable[str]) -> None:
+        rows = [(link,) for link in links]
+        if rows:
+            self._writer.submit("DELETE FROM alerted WHERE link = ?", rows)
+
+    def flush(self) -> None:
+        self._writer.flush()
+
+    def close(self) -> None:
+        self._writer.close()
+        self._conn.close()
+
+
+class AlertCache:
+    def __init__(
+        self,
+        ttl: float,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        backend=None,
+        clock=time.time,
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.backend = backend
+        self._clock = clock
+        self._expiry: Dict[str, float] = {}
+        # (expires_at, link) in insertion order; with a fixed TTL this is also expiry order
+        self._order: Deque[Tuple[float, str]] = deque()
+        if backend is not None:
+            for link, expires_at in backend.load(self._clock()):
+                self._expiry[link] = expires_at
+                self._order.append((expires_at, link))
+            self._enforce_cap()
+
+    def __len__(self) -> int:
+        self._evict_expired(self._clock())
+        return len(self._expiry)
+
+    def __contains__(self, link: str) -> bool:
+        now = self._clock()
+        self._evict_expired(now)
+        expires_at = self._expiry.get(link)
+        return expires_at is not None and expires_at > now
+
+    def add(self, link: str) -> None:
+        expires_at = self._clock() + self.ttl
+        # Re-adding leaves a stale deque entry behind; it is skipped on eviction
+        self._expiry[link] = expires_at
+        self._order.append((expires_at, link))
+        if self.backend is not None:
+            self.backend.add(link, expires_at)
+        self._enforce_cap()
+
+    def discard(self, link: str) -> None:
+        # The stale deque entry is skipped on eviction because the expiry no longer matches
+        if self._expiry.pop(link, None) is not None and self.backend is not None:
+            self.backend.discard([link])
+
+    def _evict_expired(self, now: float) -> None:
+        dropped = []
+        while self._order and self._order[0][0] <= now:
+            expires_at, link = self._order.popleft()
+            if self._expiry.get(link) == expires_at:
+                del self._expiry[link]
+                dropped.append(link)
+        if dropped and self.backend is not None:
+            self.backend.discard(dropped)
+
+    def _enforce_cap(self) -> None:
+        dropped = []
+        while len(self._expiry) > self.max_entries and self._order:
+            expires_at, link = self._order.popleft()
+            if self._expiry.get(link) == expires_at:
+                del self._expiry[link]
+                dropped.append(link)
+        # Stale entries from re-adds can pile up; compact when they dominate the deque
+        if len(self._order) > 2 * max(len(self._expiry), 1):
+            self._order = deque((exp, link) for exp, link in self._order if self._expiry.get(link) == exp)
+        if dropped and self.backend is not None:
+            self.backend.discard(dropped)
+
+    def close(self) -> None:
+        if self.backend is not None:
+            self.backend.close()
+
+
+def open_alert_cache(ttl: float, db_path: Optional[Path] = None, max_entries: int = DEFAULT_MAX_ENTRIES) -> AlertCache:
+    backend = SQLiteAlertBackend(db_path) if db_path is not None else None
+    return AlertCache(ttl, max_entries=max_entries, backend=backend)
@@ -0,0 +1,110 @@
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from messageChunker import MAX_MESSAGE_LEN, iter_chunks  # noqa: E402
+
+WORDS = "the quick brown fox jumps over lazy dogs while journal entries pile up every day".split()
+
+
+def make_entries(n_entries: int, seed: int = 0):
+    # Formatted journal rows: mostly short, with an occasional wall of text far
+    # past the message limit
+    rng = random.Random(seed)
+    entries = []
+    for i in range(n_entries):
+        words = rng.randint(5, 120) if i % 50 else rng.randint(800, 3000)
+        body = " ".join(rng.choice(WORDS) for _ in range(words))
+        entries.append(f"user{i % 7}\n2025-01-{i % 28 + 1:02d} Wed 09:15:00 AM\n\n{body}\n")
+    return entries
+
+
+def legacy_pack(parts, suffix=""):
+    # The journal_get packer this module replaced
+    chunks = []
+    cur = ""
+    for p in parts:
+        candidate = (cur + "\n\n" + p) if cur else p
+        if len(candidate) > MAX_MESSAGE_LEN:
+            if cur:
+                chunks.append(cur)
+                cur = p
+                if len(cur) > MAX_MESSAGE_LEN:
+                    for i in range(0, len(cur), MAX_MESSAGE_LEN):
+                        chunks.append(cur[i : i + MAX_MESSAGE_LEN])
+                    cur = ""
+            else:
+                for i in range(0, len(p), MAX_MESSAGE_LEN):
+                    chunks.append(p[i : i + MAX_MESSAGE_LEN])
+                cur = ""
+        else:
+            cur = candidate
+    if cur:
+        chunks.append(cur)
+    if suffix:
+        if chunks and len(chunks[-1]) + len(suffix) <= MAX_MESSAGE_LEN:
+            chunks[-1] += suffix
+        else:
+            chunks.append(suffix)
+    return chunks
+
+
+def streaming_pack(parts, suffix=""):
+    return list(iter_chunks(iter(parts), tail=suffix))
+
+
+def measure(fn, entries, repeat: int):
+    suffix = "\n...and 3 more."
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(entries, suffix)
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    chunks = fn(entries, suffix)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    timings.sort()
+    # Word fragments that appear in no entry: what hard cuts at the limit leave behind
+    known = set(suffix.split())
+    for entry in entries:
+        known.update(entry.split())
+    torn = sum(1 for chunk in chunks for word in chunk.split() if word not in known)
+    return {
+        "chunks": len(chunks),
+        "longest": max(len(c) for c in chunks),
+        "torn": torn,
+        "median_ms": timings[len(timings) // 2] * 1000,
+        "peak_kib": peak / 1024,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the streaming message chunker against the legacy journal_get packer.")
+    parser.add_argument("--entries", type=int, nargs="+", default=[25, 1000, 10000], help="Entry counts to pack (default: 25 1000 10000).")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per variant (default: 5).")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    variants = [("legacy concat packer", legacy_pack), ("streaming iter_chunks", streaming_pack)]
+    for n in args.entries:
+        entries = make_entries(n)
+        print(f"{n} entries, {sum(map(len, entries)) / 1024:.0f} KiB")
+        for name, fn in variants:
+            stats = measure(fn, entries, args.repeat)
+            print(
+                f"  {name:24s} chunks={stats['chunks']:6d} longest={stats['longest']:5d} torn={stats['torn']:5d} "
+                f"median={stats['median_ms']:9.2f} ms peak={stats['peak_kib']:9.0f} KiB"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,119 @@
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from htmlExtract import PARSER_BACKEND, extract_reddit_titles  # noqa: E402
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+LEGACY_TITLE_CLASS = (
+    "block text-neutral-content-strong m-0 visited:text-neutral-content-weak font-semibold "
+    "text-16-scalable xs:text-18-scalable mb-2xs xs:mb-xs overflow-hidden"
+)
+
+
+def make_reddit_listing(n_posts: int = 50) -> str:
+    # Synthetic listing shaped like Reddit's shreddit markup: every post carries a
+    # pile of attributes, nested media/vote/comment chrome and a slot="title" anchor.
+    posts = []
+    for i in range(n_posts):
+        posts.append(
+            f'<shreddit-post id="t3_{i:06x}" permalink="/r/hardwareswap/comments/{i:06x}/post_{i}/" '
+            f'post-title="[USA-CA] [H] RTX {3000 + i} [W] PayPal" author="user{i}" score="{i}" '
+            f'comment-count="{i % 17}" created-timestamp="2025-01-01T00:00:{i % 60:02d}.000000+0000">'
+            '<div class="flex justify-between items-center"><span class="flex items-center gap-xs">'
+            + '<faceplate-tracker source="post" action="click" noun="subreddit">'
+            '<a href="/r/hardwareswap/" class="flex items-center text-neutral-content-weak">r/hardwareswap</a>'
+            '</faceplate-tracker></span>'
+            + ''.join(f'<span class="badge badge-{j}">flair {j}</span>' for j in range(6))
+            + '</div>'
+            f'<a id="post-title-t3_{i:06x}" slot="title" class="{LEGACY_TITLE_CLASS}" '
+            f'href="/r/hardwareswap/comments/{i:06x}/post_{i}/">'
+            f'[USA-CA] [H] RTX {3000 + i} Founders Edition [W] PayPal, Local Cash</a>'
+            '<div slot="text-body"><div class="md"><p>'
+            + 'Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 8
+            + '</p></div></div>'
+            '<svg viewBox="0 0 20 20"><path d="M10 0 L20 20 L0 20 Z"></path></svg>'
+            '</shreddit-post>'
+        )
+    head = '<script type="application/json">' + '{"k": "v"}' * 2000 + '</script>'
+    return f"<!DOCTYPE html><html><head>{head}</head><body><main>{''.join(posts)}</main></body></html>"
+
+
+def legacy_extract(html: str):
+    soup = BeautifulSoup(html, "html.parser")
+    titles = []
+    base_url = "https://www.reddit.com"
+    for title_element in soup.find_all("a", class_=LEGACY_TITLE_CLASS):
+        if title_element.has_attr("slot") and title_element["slot"] == "title":
+            href = title_element.get("href")
+            if not href.startswith(base_url):
+                href = base_url + href
+            titles.append({"title": title_element.text, "link": href})
+    return titles
+
+
+def measure(fn, html: str, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(html)
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    result = fn(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    timings.sort()
+    return {
+        "posts": len(result),
+        "median_ms": timings[len(timings) // 2] * 1000,
+        "min_ms": timings[0] * 1000,
+        "peak_kib": peak / 1024,
+    }
+
+
+def load_fixture(path, posts: int) -> str:
+    if path:
+        return Path(path).read_text(encoding="utf-8")
+    recorded = FIXTURES_DIR / "reddit_listing.html"
+    if recorded.exists():
+        return recorded.read_text(encoding="utf-8")
+    return make_reddit_listing(posts)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Compare Reddit title extraction against the legacy full-tree parse.")
+    parser.add_argument("--fixture", help="Recorded listing HTML (default: fixtures/reddit_listing.html or synthetic).")
+    parser.add_argument("--posts", type=int, default=50, help="Posts in the synthetic listing (default: 50).")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per variant (default: 20).")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    html = load_fixture(args.fixture, args.posts)
+    variants = [
+        ("legacy html.parser full tree", legacy_extract),
+        ("strainer html.parser", lambda h: extract_reddit_titles(h, parser="html.parser")),
+    ]
+    if PARSER_BACKEND != "html.parser":
+        variants.append((f"strainer {PARSER_BACKEND}", extract_reddit_titles))
+
+    print(f"fixture: {len(html) / 1024:.0f} KiB")
+    for name, fn in variants:
+        stats = measure(fn, html, args.repeat)
+        print(
+            f"{name:32s} posts={stats['posts']:4d} median={stats['median_ms']:8.2f} ms "
+            f"min={stats['min_ms']:8.2f} ms peak={stats['peak_kib']:9.0f} KiB"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,350 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import scrapers  # noqa: E402
+from bench_extract import make_reddit_listing  # noqa: E402
+from htmlExtract import PARSER_BACKEND  # noqa: E402
+from journalLog import JournalStore  # noqa: E402
+from keywordMatcher import KeywordMatcher  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# Offline benchmarks for the scrapers' parse step and the journal queries.
+# Results can be written as JSON and compared against the committed baseline
+# (benchmarks/baseline.json, recorded with --large --runs 3), e.g.
+#   python benchmarks/bench_suite.py --json bench.json --baseline
+# The fixtures under fixtures/ are offline stand-ins built from the markup each
+# parser targets; --record NAME=URL replaces one with a live page.
+
+BENCH_DIR = Path(__file__).resolve().parent
+FIXTURES_DIR = BENCH_DIR / "fixtures"
+DATA_DIR = BENCH_DIR / "data"
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+
+# Scraper -> recorded page under fixtures/; a synthetic page stands in when it's missing
+SCRAPER_FIXTURES = {
+    "reddit": "reddit_listing.html",
+    "reddit2": "reddit_hw_listing.html",
+    "pid": "pid_product.html",
+    "fish": "fish_product.html",
+    "toothless": "toothless_product.html",
+}
+
+DEFAULT_SIZES = [10_000, 100_000]
+# Added by --large; the first run spends most of a minute building it
+LARGE_SIZE = 1_000_000
+DEFAULT_USERS = 50
+ADMIN_ID = "admin"
+# Only medians are compared: p99 of a few dozen samples is close to the max and
+# moves with whatever else the machine is doing
+GATED_METRICS = ("median_ms", "p50_ms")
+WORDS = "today went to the store and bought some fish then read a book about rust and python at night".split()
+
+
+def _keywords(name: str, default: str):
+    return (os.getenv(name) or default).split(",")
+
+
+def make_matchers():
+    # Same keyword lists as the bot when the env is set, a fixed sample otherwise
+    reddit = KeywordMatcher(
+        [_keywords("KEYWORDS", "rtx,gpu,3080,4090"), _keywords("OTHER_KEYWORDS", "usa,paypal")],
+        names=["keywords", "other"],
+    )
+    hw = KeywordMatcher([_keywords("NEW_OTHER_KEYWORDS", "rtx,founders")], names=["have"])
+    return reddit, hw
+
+
+def make_pid_page(filler: int = 400) -> str:
+    # Product page shaped like the PID store: layout noise around the stock panel
+    noise = "".join(
+        f'<div class="row"><div class="col-md-4"><a href="/p/{i}">Related item {i}</a>'
+        f'<span class="price">${i}.99</span></div></div>'
+        for i in range(filler)
+    )
+    panel = (
+        '<div class="col-xs-12 padding-v-10">Model: PID-100</div>'
+        '<div class="col-xs-12 padding-v-10"><strong>Availability:</strong> In Stock</div>'
+    )
+    return f"<!DOCTYPE html><html><head><title>PID</title></head><body>{noise}{panel}{noise}</body></html>"
+
+
+def load_page(name: str, posts: int) -> str:
+    recorded = FIXTURES_DIR / SCRAPER_FIXTURES[name]
+    if recorded.exists():
+        return recorded.read_text(encoding="utf-8")
+    if name in ("reddit", "reddit2"):
+        return make_reddit_listing(posts)
+    if name == "pid":
+        return make_pid_page()
+    raise FileNotFoundError(f"no fixture for {name}: {recorded}")
+
+
+async def record_fixtures(targets):
+    # Save live pages as fixtures (the only step that touches the network)
+    from fetchEngine import FetchEngine
+
+    fetcher = FetchEngine(headers={"User-Agent": "Mozilla/5.0 (bench_suite fixture recorder)"})
+    try:
+        FIXTURES_DIR.mkdir(parents=True, exist_ok=True)
+        for name, url in targets:
+            result = await fetcher.fetch(url)
+            (FIXTURES_DIR / SCRAPER_FIXTURES[name]).write_text(result.text, encoding="utf-8")
+            print(f"recorded {name}: {url} ({len(result.body) / 1024:.0f} KiB)")
+    finally:
+        await fetcher.close()
+
+
+def peak_rss_kib():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return peak / 1024 if sys.platform == "darwin" else peak
+
+
+def percentile(sorted_values, pct: float) -> float:
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def bench_parse(fn, html: str, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(html)
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    fn(html)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    timings.sort()
+    return {
+        "page_kib": len(html) / 1024,
+        "median_ms": timings[len(timings) // 2] * 1000,
+        "p99_ms": percentile(timings, 99) * 1000,
+        "alloc_peak_kib": peak / 1024,
+    }
+
+
+def build_journal(path: Path, rows: int, users: int, seed: int = 0) -> None:
+    # Entries spread over the last three years, oldest first like a real journal
+    rng = random.Random(seed)
+    now = datetime.now().astimezone()
+    start = now - timedelta(days=3 * 365)
+    span = int((now - start).total_seconds())
+    step = span / rows
+
+    def generate():
+        for i in range(rows):
+            dt = start + timedelta(seconds=int(i * step))
+            content = " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 60)))
+            yield (str(rng.randrange(users)), dt.isoformat(), int(dt.timestamp()), dt.tzname() or "", content)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_suffix(".partial")
+    for stale in (partial, Path(f"{partial}-wal"), Path(f"{partial}-shm")):
+        stale.unlink(missing_ok=True)
+    with JournalStore(partial) as store:
+        store.import_rows(generate())
+    partial.rename(path)
+
+
+def journal_db(rows: int, users: int, rebuild: bool) -> Path:
+    path = DATA_DIR / f"journal_{rows}.db"
+    if rebuild and path.exists():
+        path.unlink()
+    if not path.exists():
+        start = time.perf_counter()
+        build_journal(path, rows, users)
+        print(f"built {path.name} in {time.perf_counter() - start:.1f}s")
+    return path
+
+
+def journal_cases():
+    # (label, requester, target, uses date, uses days) mirroring journal_get's filters
+    return [
+        ("user", "self", None, False, False),
+        ("user+date", "self", None, True, False),
+        ("user+days", "self", None, False, True),
+        ("admin", ADMIN_ID, None, False, False),
+        ("admin+date", ADMIN_ID, None, True, False),
+        ("admin+days", ADMIN_ID, None, False, True),
+        ("admin+target", ADMIN_ID, "target", False, False),
+        ("admin+target+date", ADMIN_ID, "target", True, False),
+        ("admin+target+days", ADMIN_ID, "target", False, True),
+    ]
+
+
+def bench_journal(path: Path, users: int, queries: int, seed: int = 1):
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    try:
+        first, last = conn.execute("SELECT MIN(created_at_epoch), MAX(created_at_epoch) FROM journal").fetchone()
+    finally:
+        conn.close()
+    results = {}
+    with JournalStore(path, migrate=False) as store:
+        for label, requester, target, use_date, use_days in journal_cases():
+            timings = []
+            for _ in range(queries):
+                user = str(rng.randrange(users))
+                req = user if requester == "self" else requester
+                tgt = user if target == "target" else None
+                date = datetime.fromtimestamp(rng.randint(first, last)).strftime("%Y-%m-%d") if use_date else None
+                days = rng.choice([0, 1, 7, 30]) if use_days else None
+                start = time.perf_counter()
+                # What one journal_get does: a page, then a count if there are more
+                rows, more = store.get_page(req, ADMIN_ID, tgt, date, days, limit=5)
+                if more:
+                    store.count_entries(req, ADMIN_ID, tgt, date, days)
+                timings.append(time.perf_counter() - start)
+            timings.sort()
+            results[label] = {
+                "p50_ms": percentile(timings, 50) * 1000,
+                "p99_ms": percentile(timings, 99) * 1000,
+            }
+    return results
+
+
+def compare(results, baseline, tolerance: float, min_delta_ms: float):
+    # Medians that got slower than the baseline by more than the tolerance
+    regressions = []
+    for key, metrics in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        for metric in GATED_METRICS:
+            if metric not in metrics or metric not in base:
+                continue
+            now, before = metrics[metric], base[metric]
+            if now > before * (1 + tolerance) and now - before > min_delta_ms:
+                regressions.append(f"{key} {metric}: {before:.3f} -> {now:.3f} ms")
+    return regressions
+
+
+def run_suite(args, rebuild: bool):
+    results = {}
+    if args.only != "journal":
+        reddit, hw = make_matchers()
+        parsers = {
+            "reddit": lambda html: scrapers.parse_reddit(html, reddit),
+            "reddit2": lambda html: scrapers.parse_reddit2(html, hw),
+            "pid": scrapers.parse_pid,
+            "fish": scrapers.parse_fish_price,
+            "toothless": scrapers.parse_toothless_lunchbag,
+        }
+        for name, fn in parsers.items():
+            html = load_page(name, args.posts)
+            stats = results[f"parse/{name}"] = bench_parse(fn, html, args.repeat)
+            print(
+                f"parse/{name:9s} page={stats['page_kib']:6.0f} KiB median={stats['median_ms']:8.2f} ms "
+                f"p99={stats['p99_ms']:8.2f} ms alloc_peak={stats['alloc_peak_kib']:8.0f} KiB"
+            )
+
+    if args.only != "scrapers":
+        sizes = args.sizes + [LARGE_SIZE] if args.large and LARGE_SIZE not in args.sizes else args.sizes
+        for size in sizes:
+            path = journal_db(size, args.users, rebuild)
+            for label, stats in bench_journal(path, args.users, args.queries).items():
+                key = f"journal/{size}/{label}"
+                results[key] = stats
+                print(f"{key:36s} p50={stats['p50_ms']:7.3f} ms p99={stats['p99_ms']:7.3f} ms")
+
+    return results
+
+
+def median_results(runs):
+    # Per metric, the median over whole passes of the suite
+    results = {}
+    for key, metrics in runs[0].items():
+        results[key] = {
+            metric: statistics.median(run[key][metric] for run in runs) for metric in metrics
+        }
+    return results
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmarks for scraper parsing and journal queries.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Synthetic journal sizes in rows (default: 10000 100000).")
+    parser.add_argument("--large", action="store_true", help=f"Also run a {LARGE_SIZE:,}-row journal.")
+    parser.add_argument("--users", type=int, default=DEFAULT_USERS, help="Distinct users in the synthetic journals (default: 50).")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per journal filter combination (default: 200).")
+    parser.add_argument("--repeat", type=int, default=20, help="Timed runs per scraper parse (default: 20).")
+    parser.add_argument("--posts", type=int, default=50, help="Posts in synthetic Reddit listings (default: 50).")
+    parser.add_argument("--runs", type=int, default=1, help="Passes over the whole suite; each metric keeps its median (default: 1).")
+    parser.add_argument("--only", choices=("scrapers", "journal"), help="Run one half of the suite.")
+    parser.add_argument("--rebuild", action="store_true", help="Regenerate the synthetic journal databases.")
+    parser.add_argument("--record", nargs="+", metavar="NAME=URL", help="Record live pages as fixtures (names: %s) and exit." % ", ".join(SCRAPER_FIXTURES))
+    parser.add_argument("--json", help="Write results to this JSON file.")
+    parser.add_argument(
+        "--baseline",
+        nargs="?",
+        const=str(BASELINE_PATH),
+        help="Compare against a JSON file from an earlier --json run (default: benchmarks/baseline.json); exit 1 on regression.",
+    )
+    parser.add_argument("--tolerance", type=float, default=1.0, help="Allowed slowdown vs the baseline (default: 1.0 = 2x).")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Ignore slowdowns smaller than this (default: 1 ms).")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.record:
+        targets = []
+        for item in args.record:
+            name, _, url = item.partition("=")
+            if name not in SCRAPER_FIXTURES or not url:
+                print(f"bad --record target {item!r}")
+                return 2
+            targets.append((name, url))
+        asyncio.run(record_fixtures(targets))
+        return 0
+
+    # Journals are rebuilt (if asked) for the first pass only
+    runs = [run_suite(args, args.rebuild and i == 0) for i in range(max(1, args.runs))]
+    results = median_results(runs)
+    print(f"peak RSS: {peak_rss_kib() or 0:.0f} KiB")
+    if args.json:
+        payload = {
+            "meta": {
+                "python": platform.python_version(),
+                "sqlite": sqlite3.sqlite_version,
+                "parser": PARSER_BACKEND,
+                "platform": platform.platform(),
+                "runs": args.runs,
+                "peak_rss_kib": peak_rss_kib(),
+            },
+            "results": results,
+        }
+        Path(args.json).write_text(json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8")).get("results", {})
+        regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+        print(f"no regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,267 @@
+import asyncio
+import codecs
+import hashlib
+import json
+import time
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Mapping, NamedTuple, Optional, Tuple, TypeVar
+
+import aiohttp
+
+from metrics import BYTES_BUCKETS, METRICS, current_watcher
+from parsePool import ParsePool
+
+# Shared async HTTP layer for the watchers. One pooled ClientSession is reused
+# by every scraper so requests run concurrently without blocking the bot loop.
+
+DEFAULT_TOTAL_TIMEOUT = 20
+DEFAULT_CONNECT_TIMEOUT = 10
+DEFAULT_LIMIT = 20
+DEFAULT_LIMIT_PER_HOST = 4
+DEFAULT_KEEPALIVE = 30
+
+DEFAULT_RATE_LIMIT_BACKOFF = 60
+DEFAULT_CHUNK_SIZE = 16 * 1024
+
+T = TypeVar("T")
+
+
+class RateLimitedError(Exception):
+    # Raised on 429 (or 503 with Retry-After) so the scheduler can back off
+    def __init__(self, url: str, status: int, retry_after: float):
+        super().__init__(f"{url} rate limited ({status}), retry after {retry_after:.0f}s")
+        self.url = url
+        self.status = status
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str], default: float = DEFAULT_RATE_LIMIT_BACKOFF) -> float:
+    # Retry-After is either delta-seconds or an HTTP date
+    if not value:
+        return default
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return default
+
+
+class FetchResult(NamedTuple):
+    url: str
+    status: int
+    headers: Mapping[str, str]
+    body: bytes
+    charset: Optional[str]
+    # True when the server answered 304 or returned a body identical to the last one
+    not_modified: bool = False
+
+    @property
+    def text(self) -> str:
+        return self.body.decode(self.charset or "utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class StreamResult(NamedTuple):
+    url: str
+    status: int
+    bytes_read: int
+    # False when the consumer asked to stop before the body ended
+    complete: bool
+
+
+class _Validators(NamedTuple):
+    etag: Optional[str]
+    last_modified: Optional[str]
+    digest: bytes
+
+
+def _body_digest(body: bytes) -> bytes:
+    return hashlib.blake2b(body, digest_size=16).digest()
+
+
+class FetchEngine:
+    def __init__(
+        self,
+        headers: Optional[Mapping[str, str]] = None,
+        limit: int = DEFAULT_LIMIT,
+        limit_per_host: int = DEFAULT_LIMIT_PER_HOST,
+        keepalive_timeout: float = DEFAULT_KEEPALIVE,
+        total_timeout: float = DEFAULT_TOTAL_TIMEOUT,
+        connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+        parse_pool: Optional[ParsePool] = None,
+    ):
+        self.headers = dict(headers or {})
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(total=total_timeout, connect=connect_timeout)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_lock = asyncio.Lock()
+        # Per-URL ETag / Last-Modified / body hash from the last 200 response
+        self._validators: Dict[str, _Validators] = {}
+        # Last parse result per (url, parser) so unchanged pages are not re-parsed
+        self._parsed: Dict[Tuple[str, Callable], object] = {}
+        # fetch_parsed hands bodies to this; the default parses inline
+        self.parse_pool = parse_pool or ParsePool()
+
+    async def session(self) -> aiohttp.ClientSession:
+        # The session must be created inside the running loop, so build it lazily
+        if self._session is None or self._session.closed:
+            async with self._session_lock:
+                if self._session is None or self._session.closed:
+                    connector = aiohttp.TCPConnector(
+                        limit=self.limit,
+                        limit_per_host=self.limit_per_host,
+                        keepalive_timeout=self.keepalive_timeout,
+                        ttl_dns_cache=300,
+                    )
+                    self._session = aiohttp.ClientSession(
+                        connector=connector,
+                        timeout=self.timeout,
+                        headers=self.headers,
+                    )
+        return self._session
+
+    async def fetch(
+        self,
+        url: str,
+        headers: Optional[Mapping[str, str]] = None,
+        timeout: Optional[float] = None,
+        conditional: bool = False,
+    ) -> FetchResult:
+        session = await self.session()
+        request_headers = dict(headers or {})
+        cached = self._validators.get(url) if conditional else None
+        if cached is not None:
+            if cached.etag:
+                request_headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                request_headers["If-Modified-Since"] = cached.last_modified
+        kwargs = {}
+        if timeout is not None:
+            kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
+        watcher = current_watcher.get()
+        start = time.perf_counter()
+        try:
+            async with session.get(url, headers=request_headers or None, **kwargs) as resp:
+                body = await resp.read()
+                result = FetchResult(str(resp.url), resp.status, resp.headers, body, resp.charset)
+        except Exception as e:
+            METRICS.counter("fetch_errors_total", "Fetches that raised", watcher=watcher, error=type(e).__name__).inc()
+            raise
+        METRICS.histogram("fetch_seconds", "Fetch latency", watcher=watcher).observe(time.perf_counter() - start)
+        METRICS.histogram("fetch_bytes", "Response body size", BYTES_BUCKETS, watcher=watcher).observe(len(body))
+        METRICS.counter("fetch_responses_total", "Responses by status", watcher=watcher, status=result.status).inc()
+
+        retry_after = result.headers.get("Retry-After")
+        if result.status == 429 or (result.status == 503 and retry_after):
+            raise RateLimitedError(url, result.status, parse_retry_after(retry_after))
+
+        if not conditional:
+            return result
+
+        if result.status == 304 and cached is not None:
+            return result._replace(not_modified=True)
+
+        if result.status != 200:
+            return result
+
+        # Servers that ignore validators still get short-circuited by the body hash
+        digest = _body_digest(body)
+        unchanged = cached is not None and cached.digest == digest
+        self._validators[url] = _Validators(
+            result.headers.get("ETag"),
+            result.headers.get("Last-Modified"),
+            digest,
+        )
+        return result._replace(not_modified=unchanged)
+
+    async def get_text(
+        self,
+        url: str,
+        headers: Optional[Mapping[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> str:
+        return (await self.fetch(url, headers=headers, timeout=timeout)).text
+
+    async def fetch_parsed(
+        self,
+        url: str,
+        parse: Callable[[str], T],
+        headers: Optional[Mapping[str, str]] = None,
+        timeout: Optional[float] = None,
+    ) -> T:
+        key = (url, parse)
+        result = await self.fetch(url, headers=headers, timeout=timeout, conditional=True)
+        if result.not_modified:
+            if key in self._parsed:
+                METRICS.counter("parse_skipped_total", "Unchanged pages served from the parse memo", watcher=current_watcher.get()).inc()
+                return self._parsed[key]  # type: ignore[return-value]
+            if result.status == 304:
+                # Validators came from another parser's fetch; we still need a body
+                result = await self.fetch(url, headers=headers, timeout=timeout)
+
+        with METRICS.timer("parse_seconds", "Time spent parsing fetched pages", watcher=current_watcher.get()):
+            parsed = await self.parse_pool.parse(parse, result.body, result.charset)
+        if result.status == 200:
+            self._parsed[key] = parsed
+        return parsed
+
+    async def stream(
+        self,
+        url: str,
+        consume: Callable[[str], bool],
+        headers: Optional[Mapping[str, str]] = None,
+        timeout: Optional[float] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> StreamResult:
+        # Feed decoded chunks to consume() until it returns True or the body ends;
+        # stopping early drops the rest of the download
+        session = await self.session()
+        kwargs = {}
+        if timeout is not None:
+            kwargs["timeout"] = aiohttp.ClientTimeout(total=timeout)
+        bytes_read = 0
+        watcher = current_watcher.get()
+        start = time.perf_counter()
+        try:
+            async with session.get(url, headers=headers, **kwargs) as resp:
+                retry_after = resp.headers.get("Retry-After")
+                if resp.status == 429 or (resp.status == 503 and retry_after):
+                    raise RateLimitedError(url, resp.status, parse_retry_after(retry_after))
+                decoder = codecs.getincrementaldecoder(resp.charset or "utf-8")(errors="replace")
+                complete = True
+                async for chunk in resp.content.iter_chunked(chunk_size):
+                    bytes_read += len(chunk)
+                    if consume(decoder.decode(chunk)):
+                        complete = False
+                        break
+                else:
+                    consume(decoder.decode(b"", final=True))
+                result = StreamResult(str(resp.url), resp.status, bytes_read, complete)
+        except RateLimitedError:
+            raise
+        except Exception as e:
+            METRICS.counter("fetch_errors_total", "Fetches that raised", watcher=watcher, error=type(e).__name__).inc()
+            raise
+        METRICS.histogram("fetch_seconds", "Fetch latency", watcher=watcher).observe(time.perf_counter() - start)
+        METRICS.histogram("fetch_bytes", "Response body size", BYTES_BUCKETS, watcher=watcher).observe(bytes_read)
+        METRICS.counter("fetch_responses_total", "Responses by status", watcher=watcher, status=result.status).inc()
+        return result
+
+    def forget(self, url: str) -> None:
+        self._validators.pop(url, None)
+        for key in [k for k in self._parsed if k[0] == url]:
+            del self._parsed[key]
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        await self.parse_pool.close()
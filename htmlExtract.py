@@ -0,0 +1,86 @@
+from html.parser import HTMLParser
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+# Targeted extraction helpers for the scrapers. Only the nodes we care about are
+# turned into a tree; everything else on the page is skipped by the tokenizer.
+
+try:
+    import lxml  # noqa: F401  (optional, faster tokenizer)
+    PARSER_BACKEND = "lxml"
+except Exception:
+    PARSER_BACKEND = "html.parser"
+
+REDDIT_BASE_URL = "https://www.reddit.com"
+
+# Reddit's post title anchors are stable on slot="title"; the Tailwind class list
+# changes between layouts, so it is deliberately not part of the match.
+REDDIT_TITLE_STRAINER = SoupStrainer("a", attrs={"slot": "title", "href": True})
+
+
+def parse_only(html, strainer: SoupStrainer, parser: str = None) -> BeautifulSoup:
+    return BeautifulSoup(html, parser or PARSER_BACKEND, parse_only=strainer)
+
+
+def absolute_reddit_link(href: str, base_url: str = REDDIT_BASE_URL) -> str:
+    if not href.startswith(base_url):
+        href = base_url + href
+    return href
+
+
+def extract_reddit_titles(html, base_url: str = REDDIT_BASE_URL, parser: str = None) -> List[Dict[str, str]]:
+    soup = parse_only(html, REDDIT_TITLE_STRAINER, parser=parser)
+    posts = []
+    for anchor in soup.find_all("a"):
+        posts.append({
+            "title": anchor.get_text(),
+            "link": absolute_reddit_link(anchor["href"], base_url),
+        })
+    return posts
+
+
+class ButtonTextParser(HTMLParser):
+    # Incremental parser: finds the first <button> whose id starts with a prefix
+    # and captures the text of its first <span>. feed_chunk() returns True once
+    # the answer is known so the caller can stop downloading.
+    def __init__(self, id_prefix: str):
+        super().__init__(convert_charrefs=True)
+        self.id_prefix = id_prefix
+        self.found_button = False
+        self.span_text: Optional[str] = None
+        self.done = False
+        self._in_button = False
+        self._span_depth = 0
+        self._parts: List[str] = []
+
+    def feed_chunk(self, chunk: str) -> bool:
+        if not self.done and chunk:
+            self.feed(chunk)
+        return self.done
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if tag == "button" and not self._in_button:
+            button_id = dict(attrs).get("id") or ""
+            if button_id.startswith(self.id_prefix):
+                self.found_button = True
+                self._in_button = True
+        elif tag == "span" and self._in_button:
+            self._span_depth += 1
+
+    def handle_endtag(self, tag):
+        if self.done or not self._in_button:
+            return
+        if tag == "span" and self._span_depth:
+            self._span_depth -= 1
+            if self._span_depth == 0:
+                self.span_text = "".join(self._parts)
+                self.done = True
+        elif tag == "button":
+            self.done = True
+
+    def handle_data(self, data):
+        if self._span_depth and not self.done:
+            self._parts.append(data)
@@ -1,10 +1,22 @@
 import argparse
+import asyncio
+import csv
+import json
+import queue
 import sys
 import sqlite3
+import threading
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from itertools import islice
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 import discord
-from typing import List, Optional, Tuple
+from messageChunker import iter_chunks
+from metrics import METRICS
+from typing import IO, Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Tuple
 
 # Debug helper removed; keep code output minimal in production
 
@@ -12,6 +24,44 @@ from typing import List, Optional, Tuple
 AUTO_DELETE_DELAY = 5
 GET_RESULT_DELETE_DELAY = 30
 
+# Async store tuning: reader threads and the most inserts folded into one commit
+READ_WORKERS = 2
+MAX_WRITE_BATCH = 256
+COMMIT_BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+# journal_get paging
+DEFAULT_PAGE_SIZE = 5
+MAX_PAGE_SIZE = 25
+PAGE_VIEW_TIMEOUT = 600
+
+# journal_search
+DEFAULT_SEARCH_RESULTS = 5
+SNIPPET_TOKENS = 16
+
+# Username resolution: cached names, their lifetime and concurrent fetch_user calls
+NAME_CACHE_SIZE = 1024
+NAME_CACHE_TTL = 6 * 60 * 60
+# Ids Discord couldn't resolve (deleted, unknown, or a failed call) are retried after this
+NAME_MISS_TTL = 5 * 60
+NAME_FETCH_CONCURRENCY = 4
+# SQLite's default bound-parameter limit is 999
+MAX_SQL_PARAMS = 500
+
+# Rows per transaction when a migration rewrites existing data
+BACKFILL_CHUNK = 2000
+
+# Bulk import/export: rows per executemany / fetchmany, and the columns carried over
+IMPORT_BATCH = 5000
+EXPORT_BATCH = 5000
+EXPORT_FIELDS = ("user_id", "created_at", "created_at_epoch", "timezone", "content")
+# CSV has no null; this marks one so a NULL timezone doesn't come back as "".
+# Only the nullable columns use it, so content that is literally \N survives
+CSV_NULL = "\\N"
+CSV_NULLABLE = frozenset({"created_at_epoch", "timezone"})
+
+INSERT_ENTRY_SQL = "INSERT INTO journal (user_id, created_at, created_at_epoch, timezone, content) VALUES (?, ?, ?, ?, ?)"
+UPSERT_USER_SQL = "INSERT OR REPLACE INTO users (user_id, name, updated_at) VALUES (?, ?, ?)"
+
 try:
     from discord.ext import commands
 except Exception:
@@ -26,70 +76,257 @@ def timestamp_str() -> str:
     return f"{base} ({tz_abbr})" if tz_abbr else base
 
 
-def _ensure_db(db_path: Path) -> None:
+def _connect(db_path: Path, synchronous: str = "NORMAL", check_same_thread: bool = True) -> sqlite3.Connection:
     db_path.parent.mkdir(parents=True, exist_ok=True)
-    with sqlite3.connect(db_path) as conn:
+    conn = sqlite3.connect(db_path, check_same_thread=check_same_thread)
+    # WAL lets readers run alongside the writer; NORMAL sync is durable across
+    # app crashes and only risks the last commits on power loss
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute(f"PRAGMA synchronous={synchronous}")
+    conn.execute("PRAGMA cache_size=-8000")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    return conn
+
+
+def _create_journal(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS journal (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user_id TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            created_at_epoch INTEGER,
+            timezone TEXT,
+            content TEXT NOT NULL
+        )
+        """
+    )
+    # Ensure epoch column exists (for reliable time range queries)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(journal)")}
+    if "created_at_epoch" not in columns:
+        conn.execute("ALTER TABLE journal ADD COLUMN created_at_epoch INTEGER")
+
+
+def _create_epoch_indexes(conn: sqlite3.Connection) -> None:
+    # Range queries and ordering run on the epoch column; these indexes let
+    # SQLite walk rows already in display order instead of sorting
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_journal_user_epoch "
+        "ON journal (user_id, created_at_epoch DESC, id DESC)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_journal_epoch "
+        "ON journal (created_at_epoch DESC, id DESC)"
+    )
+
+
+def _create_users(conn: sqlite3.Connection) -> None:
+    # Last known display name per user, so the CLI can label entries too
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS users (
+            user_id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            updated_at INTEGER NOT NULL
+        )
+        """
+    )
+
+
+def _backfill_epoch(conn: sqlite3.Connection, progress: Optional[Callable[[int, int], None]] = None) -> None:
+    # Fill created_at_epoch for old rows in id order, one short transaction per
+    # chunk. The last id done is saved with each chunk, so an interrupted run
+    # resumes where it stopped; rows whose timestamp can't be parsed are noted
+    # in journal_epoch_unparsed and never looked at again.
+    with conn:
         conn.execute(
-            """
-            CREATE TABLE IF NOT EXISTS journal (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user_id TEXT NOT NULL,
-                created_at TEXT NOT NULL,
-                created_at_epoch INTEGER,
-                timezone TEXT,
-                content TEXT NOT NULL
-            )
-            """
+            "CREATE TABLE IF NOT EXISTS migration_progress (name TEXT PRIMARY KEY, last_id INTEGER NOT NULL)"
+        )
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS journal_epoch_unparsed (id INTEGER PRIMARY KEY, created_at TEXT NOT NULL)"
         )
-        # Ensure epoch column exists (for reliable time range queries)
+    row = conn.execute("SELECT last_id FROM migration_progress WHERE name = 'epoch_backfill'").fetchone()
+    last_id = row[0] if row else 0
+    total = conn.execute(
+        "SELECT COUNT(*) FROM journal WHERE id > ? AND created_at_epoch IS NULL", (last_id,)
+    ).fetchone()[0]
+    done = 0
+    while done < total:
+        rows = conn.execute(
+            "SELECT id, created_at FROM journal WHERE id > ? AND created_at_epoch IS NULL ORDER BY id LIMIT ?",
+            (last_id, BACKFILL_CHUNK),
+        ).fetchall()
+        if not rows:
+            break
+        updates = []
+        unparsed = []
+        for _id, created_at_iso in rows:
+            dt = _parse_created_at(created_at_iso)
+            if dt is not None:
+                updates.append((int(dt.timestamp()), _id))
+            else:
+                unparsed.append((_id, created_at_iso))
+        last_id = rows[-1][0]
+        with conn:
+            conn.executemany("UPDATE journal SET created_at_epoch = ? WHERE id = ?", updates)
+            conn.executemany("INSERT OR IGNORE INTO journal_epoch_unparsed (id, created_at) VALUES (?, ?)", unparsed)
+            conn.execute(
+                "INSERT OR REPLACE INTO migration_progress (name, last_id) VALUES ('epoch_backfill', ?)",
+                (last_id,),
+            )
+        done += len(rows)
+        if progress is not None:
+            progress(done, total)
+
+
+class _Migration(NamedTuple):
+    name: str
+    apply: Callable
+    # Applied in one transaction with the version bump; otherwise the step
+    # commits its own work and must be safe to re-run after an interruption
+    transactional: bool = True
+
+
+# Schema history. PRAGMA user_version counts how many of these have run, so
+# each one runs once per database. Append new steps; never reorder or remove.
+MIGRATIONS: List[_Migration] = [
+    _Migration("create journal", _create_journal),
+    _Migration("epoch indexes", _create_epoch_indexes),
+    _Migration("full-text index", lambda conn: _ensure_fts(conn)),
+    _Migration("users table", _create_users),
+    _Migration("epoch backfill", _backfill_epoch, transactional=False),
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def _schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def _report_progress(name: str) -> Callable[[int, int], None]:
+    def report(done: int, total: int) -> None:
+        print(f"Migrating journal ({name}): {done}/{total} rows", file=sys.stderr)
+    return report
+
+
+def _migrate(conn: sqlite3.Connection, report: bool = True) -> None:
+    version = _schema_version(conn)
+    # A newer schema than we know about is left alone
+    for number in range(version, SCHEMA_VERSION):
+        step = MIGRATIONS[number]
+        if step.transactional:
+            # BEGIN explicitly: sqlite3 won't open a transaction for DDL on its own
+            with conn:
+                conn.execute("BEGIN")
+                step.apply(conn)
+                conn.execute(f"PRAGMA user_version = {number + 1}")
+        else:
+            step.apply(conn, _report_progress(step.name) if report else None)
+            with conn:
+                conn.execute(f"PRAGMA user_version = {number + 1}")
+
+
+def _parse_created_at(created_at_iso: str) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(created_at_iso)
+    except Exception:
+        pass
+    # Attempt to parse common formats
+    try:
+        return datetime.strptime(created_at_iso, "%Y-%m-%d %H:%M:%S%z")
+    except Exception:
+        return None
+
+
+def _ensure_fts(conn: sqlite3.Connection) -> bool:
+    # External-content FTS5 index over journal.content, kept in sync by triggers.
+    # Returns False when this SQLite build has no FTS5 (search is then unavailable).
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'journal_fts'"
+    ).fetchone() is not None
+    if not exists:
         try:
-            conn.execute("ALTER TABLE journal ADD COLUMN created_at_epoch INTEGER")
+            conn.execute(
+                "CREATE VIRTUAL TABLE journal_fts USING fts5("
+                "content, content='journal', content_rowid='id')"
+            )
         except sqlite3.OperationalError:
-            pass
-        # Backfill epoch for existing rows where missing
-        try:
-            cur = conn.execute("SELECT id, created_at FROM journal WHERE created_at_epoch IS NULL")
-            rows = cur.fetchall()
-            for _id, created_at_iso in rows:
-                try:
-                    dt = datetime.fromisoformat(created_at_iso)
-                except Exception:
-                    # Attempt to parse common formats
-                    try:
-                        dt = datetime.strptime(created_at_iso, "%Y-%m-%d %H:%M:%S%z")
-                    except Exception:
-                        dt = None
-                if dt is not None:
-                    conn.execute(
-                        "UPDATE journal SET created_at_epoch = ? WHERE id = ?",
-                        (int(dt.timestamp()), _id),
-                    )
-        except Exception:
-            pass
+            return False
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS journal_fts_ai AFTER INSERT ON journal BEGIN
+            INSERT INTO journal_fts (rowid, content) VALUES (new.id, new.content);
+        END
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS journal_fts_ad AFTER DELETE ON journal BEGIN
+            INSERT INTO journal_fts (journal_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        END
+        """
+    )
+    conn.execute(
+        """
+        CREATE TRIGGER IF NOT EXISTS journal_fts_au AFTER UPDATE OF content ON journal BEGIN
+            INSERT INTO journal_fts (journal_fts, rowid, content) VALUES ('delete', old.id, old.content);
+            INSERT INTO journal_fts (rowid, content) VALUES (new.id, new.content);
+        END
+        """
+    )
+    if not exists:
+        # One-time build for databases that already have entries
+        conn.execute("INSERT INTO journal_fts (journal_fts) VALUES ('rebuild')")
+    return True
 
 
-def add_entry_db(db_path: Path, user_id: str, content: str) -> None:
-    _ensure_db(db_path)
-    # Capture server-local timestamp when creating the entry
-    dt = datetime.now().astimezone()
-    epoch = int(dt.timestamp())
-    # We store the ISO timestamp (with server tz) and the epoch seconds (UTC-based)
-    with sqlite3.connect(db_path) as conn:
-        conn.execute(
-            "INSERT INTO journal (user_id, created_at, created_at_epoch, timezone, content) VALUES (?, ?, ?, ?, ?)",
-            (user_id, dt.isoformat(), epoch, dt.tzname() or "", content.strip()),
-        )
+def _fts_available(conn: sqlite3.Connection) -> bool:
+    # The index exists and this SQLite build can read it
+    try:
+        conn.execute("SELECT 1 FROM journal_fts LIMIT 0")
+    except sqlite3.OperationalError:
+        return False
+    return True
 
 
-def get_entries_db(
-    db_path: Path,
+def _like_terms(text: str) -> List[str]:
+    return [word.rstrip("*") for word in text.split() if word.rstrip("*")]
+
+
+def _like_snippet(content: str, terms: List[str], tokens: int = SNIPPET_TOKENS) -> str:
+    # Rough stand-in for FTS5's snippet(): a window of words around the first hit
+    needles = [term.casefold() for term in terms]
+
+    def hit(word: str) -> bool:
+        return any(needle in word.casefold() for needle in needles)
+
+    words = content.split()
+    first = next((i for i, word in enumerate(words) if hit(word)), 0)
+    start = max(0, first - tokens // 2)
+    window = [f"**{word}**" if hit(word) else word for word in words[start : start + tokens]]
+    return ("..." if start else "") + " ".join(window) + ("..." if start + tokens < len(words) else "")
+
+
+def _fts_query(text: str) -> str:
+    # Quote each word so user input can't trip FTS5 syntax; a trailing * keeps
+    # prefix matching (e.g. "run*" finds running)
+    terms = []
+    for word in text.split():
+        prefix = word.endswith("*") and len(word) > 1
+        word = word.rstrip("*")
+        if not word:
+            continue
+        terms.append('"' + word.replace('"', '""') + '"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+def _entries_filter(
     requester_id: str,
     admin_id: Optional[str],
     target_user_id: Optional[str] = None,
     date_str: Optional[str] = None,
     days_ago: Optional[int] = None,
-) -> List[Tuple[int, str, Optional[int], str, str]]:
-    _ensure_db(db_path)
+) -> Tuple[List[str], List[object]]:
     where = []
     params: List[object] = []
 
@@ -104,15 +341,16 @@ def get_entries_db(
 
     if date_str:
         # Build local-day range using epoch to avoid TZ parsing issues in SQLite
-        try:
-            day_start = datetime.fromisoformat(date_str + "T00:00:00").astimezone()
+        day = _parse_day(date_str)
+        if day is not None:
+            day_start = day.astimezone()
             day_end = day_start + timedelta(days=1)
             where.append("created_at_epoch >= ? AND created_at_epoch < ?")
             params.extend([int(day_start.timestamp()), int(day_end.timestamp())])
-        except Exception:
-            # Fallback to textual comparison if parsing fails
-            where.append("date(created_at) = ?")
-            params.append(date_str)
+        else:
+            # date(created_at) only ever yields YYYY-MM-DD, so an unparseable date
+            # can't match anything; say so without scanning the table
+            where.append("0")
 
     if days_ago is not None:
         # Entries since now minus N days (inclusive)
@@ -120,24 +358,786 @@ def get_entries_db(
         where.append("created_at_epoch >= ?")
         params.append(int(since.timestamp()))
 
+    return where, params
+
+
+def _build_entries_query(
+    requester_id: str,
+    admin_id: Optional[str],
+    target_user_id: Optional[str] = None,
+    date_str: Optional[str] = None,
+    days_ago: Optional[int] = None,
+    limit: Optional[int] = None,
+    before: Optional[Tuple[Optional[int], int]] = None,
+    after: Optional[Tuple[Optional[int], int]] = None,
+    segment: Optional[str] = None,
+    ascending: bool = False,
+) -> Tuple[str, List[object]]:
+    where, params = _entries_filter(requester_id, admin_id, target_user_id, date_str, days_ago)
+
+    # Rows whose created_at never parsed have a NULL epoch, and NULL never
+    # compares, so keyset paging treats them as their own segment after every
+    # dated row: "dated" pages on (created_at_epoch, id), "undated" on id alone.
+    # No segment returns both, NULLs last, for unpaged reads.
+    if segment == "dated":
+        where.append("created_at_epoch IS NOT NULL")
+    elif segment == "undated":
+        where.append("created_at_epoch IS NULL")
+
+    # Keyset pagination: seek past the page edge via the index instead of
+    # OFFSET, so every page costs the same
+    order = "ASC" if after is not None or ascending else "DESC"
+    edge = before if before is not None else after
+    if edge is not None:
+        op = "<" if before is not None else ">"
+        if segment == "undated":
+            where.append(f"id {op} ?")
+            params.append(edge[1])
+        else:
+            where.append(f"(created_at_epoch, id) {op} (?, ?)")
+            params.extend(edge)
+
     # Include created_at_epoch so formatting can reliably convert to local time
     sql = "SELECT id, user_id, created_at_epoch, created_at, content FROM journal"
     if where:
         sql += " WHERE " + " AND ".join(where)
-    sql += " ORDER BY datetime(created_at) DESC"
+    if segment == "undated":
+        sql += f" ORDER BY id {order}"
+    else:
+        sql += f" ORDER BY created_at_epoch {order}, id {order}"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return sql, params
+
+
+def _build_count_query(
+    requester_id: str,
+    admin_id: Optional[str],
+    target_user_id: Optional[str] = None,
+    date_str: Optional[str] = None,
+    days_ago: Optional[int] = None,
+) -> Tuple[str, List[object]]:
+    where, params = _entries_filter(requester_id, admin_id, target_user_id, date_str, days_ago)
+    sql = "SELECT COUNT(*) FROM journal"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    return sql, params
+
+
+def _build_like_search_query(
+    text: str,
+    requester_id: str,
+    admin_id: Optional[str],
+    target_user_id: Optional[str] = None,
+    date_str: Optional[str] = None,
+    days_ago: Optional[int] = None,
+    limit: int = DEFAULT_SEARCH_RESULTS,
+) -> Tuple[str, List[object]]:
+    # Fallback for SQLite builds without FTS5: every word must appear somewhere
+    # in the entry (case-insensitive for ASCII), newest first. A scan, not a
+    # ranked index lookup, but the same filters and row shape as the FTS query.
+    where, params = _entries_filter(requester_id, admin_id, target_user_id, date_str, days_ago)
+    for term in _like_terms(text):
+        where.append("content LIKE ? ESCAPE '\\'")
+        params.append("%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+    sql = "SELECT id, user_id, created_at_epoch, created_at, content FROM journal"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY created_at_epoch DESC, id DESC LIMIT ?"
+    params.append(limit)
+    return sql, params
 
-    with sqlite3.connect(db_path) as conn:
-        cur = conn.execute(sql, params)
-        return [(row[0], row[1], row[2], row[3], row[4]) for row in cur.fetchall()]
 
+class _PageQuery(NamedTuple):
+    requester_id: str
+    admin_id: Optional[str]
+    target_user_id: Optional[str]
+    date_str: Optional[str]
+    days_ago: Optional[int]
 
-def get_distinct_user_ids(db_path: Path) -> List[str]:
-    _ensure_db(db_path)
-    with sqlite3.connect(db_path) as conn:
-        cur = conn.execute("SELECT DISTINCT user_id FROM journal ORDER BY user_id")
+
+def _build_search_query(
+    text: str,
+    requester_id: str,
+    admin_id: Optional[str],
+    target_user_id: Optional[str] = None,
+    date_str: Optional[str] = None,
+    days_ago: Optional[int] = None,
+    limit: int = DEFAULT_SEARCH_RESULTS,
+) -> Tuple[str, List[object]]:
+    # Same access control and filters as retrieval, ranked by bm25; the snippet
+    # takes the place of the content column in the returned row
+    where, params = _entries_filter(requester_id, admin_id, target_user_id, date_str, days_ago)
+    where.insert(0, "journal_fts MATCH ?")
+    params.insert(0, _fts_query(text))
+    sql = (
+        "SELECT journal.id, journal.user_id, journal.created_at_epoch, journal.created_at, "
+        f"snippet(journal_fts, 0, '**', '**', '...', {SNIPPET_TOKENS}) "
+        "FROM journal_fts JOIN journal ON journal.id = journal_fts.rowid "
+        "WHERE " + " AND ".join(where) + " ORDER BY bm25(journal_fts) LIMIT ?"
+    )
+    params.append(limit)
+    return sql, params
+
+
+def _page_key(row: Tuple[int, str, Optional[int], str, str]) -> Tuple[Optional[int], int]:
+    # (None, id) for an undated row; see _build_entries_query
+    return (row[2], row[0])
+
+
+def _parse_day(date_str: str) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(date_str + "T00:00:00")
+    except ValueError:
+        pass
+    # Accept non-padded forms like 2025-1-5 as well
+    try:
+        return datetime.strptime(date_str, "%Y-%m-%d")
+    except ValueError:
+        return None
+
+
+def _user_rows(names: Mapping[str, str]) -> List[Tuple[str, str, int]]:
+    now = int(time.time())
+    return [(user_id, name, now) for user_id, name in names.items()]
+
+
+def _entry_row(user_id: str, content: str) -> Tuple[str, str, int, str, str]:
+    # Capture server-local timestamp when creating the entry
+    dt = datetime.now().astimezone()
+    epoch = int(dt.timestamp())
+    # We store the ISO timestamp (with server tz) and the epoch seconds (UTC-based)
+    return (user_id, dt.isoformat(), epoch, dt.tzname() or "", content.strip())
+
+
+class JournalStore:
+    # Owns one long-lived connection; the schema is checked once, at open
+    def __init__(
+        self,
+        db_path: Path,
+        migrate: bool = True,
+        synchronous: str = "NORMAL",
+        check_same_thread: bool = True,
+    ):
+        self.db_path = Path(db_path)
+        self._conn = _connect(self.db_path, synchronous=synchronous, check_same_thread=check_same_thread)
+        if migrate:
+            _migrate(self._conn)
+            if not _fts_available(self._conn):
+                # Built on an SQLite without FTS5 and opened on one with it: index now
+                with self._conn:
+                    self._conn.execute("BEGIN")
+                    _ensure_fts(self._conn)
+        # Checked once per connection; search() falls back to LIKE without it
+        self.has_fts = _fts_available(self._conn)
+        if migrate and not self.has_fts:
+            print("SQLite has no FTS5; journal search falls back to a slower LIKE scan.", file=sys.stderr)
+
+    def __enter__(self) -> "JournalStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def add_entry(self, user_id: str, content: str) -> None:
+        self.insert_rows([_entry_row(user_id, content)])
+
+    def insert_rows(self, rows: List[Tuple[str, str, int, str, str]]) -> None:
+        self.write_batch([(INSERT_ENTRY_SQL, rows)])
+
+    def import_rows(self, rows: Iterable[tuple], batch_size: int = IMPORT_BATCH) -> int:
+        # Streams rows in executemany batches; one transaction, so a bad record
+        # leaves the database as it was
+        count = 0
+        rows = iter(rows)
+        with self._conn:
+            # Indexing the new rows in one statement is several times faster than
+            # the per-row FTS trigger. BEGIN explicitly: sqlite3 won't open a
+            # transaction for DDL, and the trigger must come back on rollback.
+            self._conn.execute("BEGIN")
+            fts = self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'journal_fts_ai'"
+            ).fetchone() is not None
+            if fts:
+                self._conn.execute("DROP TRIGGER journal_fts_ai")
+            last_id = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM journal").fetchone()[0]
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    break
+                self._conn.executemany(INSERT_ENTRY_SQL, batch)
+                count += len(batch)
+            if fts:
+                self._conn.execute(
+                    "INSERT INTO journal_fts (rowid, content) SELECT id, content FROM journal WHERE id > ?",
+                    (last_id,),
+                )
+                _ensure_fts(self._conn)
+        return count
+
+    def iter_rows(self, batch_size: int = EXPORT_BATCH) -> Iterator[tuple]:
+        # Every entry in insertion order, read a batch at a time (EXPORT_FIELDS order)
+        cur = self._conn.execute(
+            "SELECT user_id, created_at, created_at_epoch, timezone, content FROM journal ORDER BY id"
+        )
+        while True:
+            batch = cur.fetchmany(batch_size)
+            if not batch:
+                return
+            yield from batch
+
+    def write_batch(self, ops: List[Tuple[str, List[tuple]]]) -> None:
+        # All statements land in one transaction (one commit, one fsync)
+        with self._conn:
+            for sql, rows in ops:
+                self._conn.executemany(sql, rows)
+
+    def save_user_names(self, names: Mapping[str, str]) -> None:
+        self.write_batch([(UPSERT_USER_SQL, _user_rows(names))])
+
+    def user_names(self, user_ids: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        # Stored names for the given ids, or every stored name when ids is None
+        if user_ids is None:
+            return dict(self._conn.execute("SELECT user_id, name FROM users").fetchall())
+        user_ids = list(user_ids)
+        names: Dict[str, str] = {}
+        for i in range(0, len(user_ids), MAX_SQL_PARAMS):
+            chunk = user_ids[i : i + MAX_SQL_PARAMS]
+            marks = ", ".join("?" * len(chunk))
+            cur = self._conn.execute(f"SELECT user_id, name FROM users WHERE user_id IN ({marks})", chunk)
+            names.update(cur.fetchall())
+        return names
+
+    def get_entries(
+        self,
+        requester_id: str,
+        admin_id: Optional[str],
+        target_user_id: Optional[str] = None,
+        date_str: Optional[str] = None,
+        days_ago: Optional[int] = None,
+    ) -> List[Tuple[int, str, Optional[int], str, str]]:
+        return list(self.iter_entries(requester_id, admin_id, target_user_id, date_str, days_ago))
+
+    def iter_entries(
+        self,
+        requester_id: str,
+        admin_id: Optional[str],
+        target_user_id: Optional[str] = None,
+        date_str: Optional[str] = None,
+        days_ago: Optional[int] = None,
+        batch_size: int = EXPORT_BATCH,
+    ) -> Iterator[Tuple[int, str, Optional[int], str, str]]:
+        sql, params = _build_entries_query(requester_id, admin_id, target_user_id, date_str, days_ago)
+        cur = self._conn.execute(sql, params)
+        while True:
+            batch = cur.fetchmany(batch_size)
+            if not batch:
+                return
+            for row in batch:
+                yield (row[0], row[1], row[2], row[3], row[4])
+
+    def get_page(
+        self,
+        requester_id: str,
+        admin_id: Optional[str],
+        target_user_id: Optional[str] = None,
+        date_str: Optional[str] = None,
+        days_ago: Optional[int] = None,
+        limit: int = 5,
+        before: Optional[Tuple[Optional[int], int]] = None,
+        after: Optional[Tuple[Optional[int], int]] = None,
+    ) -> Tuple[List[Tuple[int, str, Optional[int], str, str]], bool]:
+        # One page, newest first, plus whether more rows exist past it in the
+        # direction we moved (fetched as one extra row rather than a COUNT).
+        # Undated rows come after all dated ones; a page may span the boundary.
+        query = (requester_id, admin_id, target_user_id, date_str, days_ago)
+        # A date filter can never match an undated row
+        undated = not date_str and days_ago is None
+        if after is not None:
+            # Newer, walking up: the rest of the undated rows, then dated ones oldest first
+            if after[0] is None:
+                segments = [("undated", after), ("dated", None)]
+            else:
+                segments = [("dated", after)]
+        elif before is not None and before[0] is None:
+            segments = [("undated", before)]
+        else:
+            segments = [("dated", before)] + ([("undated", None)] if undated else [])
+
+        want = limit + 1
+        rows: List[Tuple[int, str, Optional[int], str, str]] = []
+        for segment, edge in segments:
+            if len(rows) >= want:
+                break
+            sql, params = _build_entries_query(
+                *query,
+                limit=want - len(rows),
+                before=edge if after is None else None,
+                after=edge if after is not None else None,
+                segment=segment,
+                ascending=after is not None,
+            )
+            rows.extend((row[0], row[1], row[2], row[3], row[4]) for row in self._conn.execute(sql, params))
+        more = len(rows) > limit
+        rows = rows[:limit]
+        if after is not None:
+            rows.reverse()
+        return rows, more
+
+    def search(
+        self,
+        text: str,
+        requester_id: str,
+        admin_id: Optional[str],
+        target_user_id: Optional[str] = None,
+        date_str: Optional[str] = None,
+        days_ago: Optional[int] = None,
+        limit: int = DEFAULT_SEARCH_RESULTS,
+    ) -> List[Tuple[int, str, Optional[int], str, str]]:
+        if not _fts_query(text):
+            return []
+        if not self.has_fts:
+            sql, params = _build_like_search_query(text, requester_id, admin_id, target_user_id, date_str, days_ago, limit)
+            terms = _like_terms(text)
+            return [(row[0], row[1], row[2], row[3], _like_snippet(row[4], terms)) for row in self._conn.execute(sql, params)]
+        sql, params = _build_search_query(text, requester_id, admin_id, target_user_id, date_str, days_ago, limit)
+        return [(row[0], row[1], row[2], row[3], row[4]) for row in self._conn.execute(sql, params)]
+
+    def count_entries(
+        self,
+        requester_id: str,
+        admin_id: Optional[str],
+        target_user_id: Optional[str] = None,
+        date_str: Optional[str] = None,
+        days_ago: Optional[int] = None,
+    ) -> int:
+        sql, params = _build_count_query(requester_id, admin_id, target_user_id, date_str, days_ago)
+        return self._conn.execute(sql, params).fetchone()[0]
+
+    def explain_entries(
+        self,
+        requester_id: str,
+        admin_id: Optional[str],
+        target_user_id: Optional[str] = None,
+        date_str: Optional[str] = None,
+        days_ago: Optional[int] = None,
+    ) -> List[str]:
+        # EXPLAIN QUERY PLAN for the retrieval query, to confirm index use
+        sql, params = _build_entries_query(requester_id, admin_id, target_user_id, date_str, days_ago)
+        return [row[3] for row in self._conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+
+    def distinct_user_ids(self) -> List[str]:
+        cur = self._conn.execute("SELECT DISTINCT user_id FROM journal ORDER BY user_id")
         return [row[0] for row in cur.fetchall()]
 
 
+class UserIndex:
+    # Sorted in-memory copy of the journal's distinct user ids and their stored
+    # names, for autocomplete. A prefix lookup is a bisect plus a scan of the
+    # matches, and inserts keep the lists sorted, so the table is read only once.
+    def __init__(self):
+        self._ids: List[str] = []
+        # (casefolded name, user id), sorted
+        self._names: List[Tuple[str, str]] = []
+        self._name_of: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def load(self, user_ids: Iterable[str], names: Mapping[str, str]) -> None:
+        # Merge a snapshot from the database with anything added while it was read
+        self._ids = sorted(set(self._ids).union(user_ids))
+        merged = dict(names)
+        merged.update(self._name_of)
+        self._name_of = merged
+        self._names = sorted((name.casefold(), uid) for uid, name in merged.items())
+
+    def add_id(self, user_id: str) -> None:
+        i = bisect_left(self._ids, user_id)
+        if i == len(self._ids) or self._ids[i] != user_id:
+            self._ids.insert(i, user_id)
+
+    def set_name(self, user_id: str, name: str) -> None:
+        key = name.casefold()
+        old = self._name_of.get(user_id)
+        self._name_of[user_id] = name
+        if old is not None:
+            old_key = (old.casefold(), user_id)
+            if old_key[0] == key:
+                return
+            i = bisect_left(self._names, old_key)
+            if i < len(self._names) and self._names[i] == old_key:
+                del self._names[i]
+        insort(self._names, (key, user_id))
+
+    def name(self, user_id: str) -> Optional[str]:
+        return self._name_of.get(user_id)
+
+    def search(self, prefix: str, limit: int = 25) -> List[str]:
+        # Ids starting with prefix first, then ids whose name starts with it (case-insensitive)
+        found: List[str] = []
+        seen = set()
+        i = bisect_left(self._ids, prefix)
+        while i < len(self._ids) and len(found) < limit and self._ids[i].startswith(prefix):
+            found.append(self._ids[i])
+            seen.add(self._ids[i])
+            i += 1
+        if prefix:
+            folded = prefix.casefold()
+            i = bisect_left(self._names, (folded,))
+            while i < len(self._names) and len(found) < limit and self._names[i][0].startswith(folded):
+                user_id = self._names[i][1]
+                if user_id not in seen:
+                    found.append(user_id)
+                    seen.add(user_id)
+                i += 1
+        return found
+
+
+def _settle(fut: "asyncio.Future", exc: Optional[BaseException]) -> None:
+    if fut.cancelled():
+        return
+    if exc is None:
+        fut.set_result(None)
+    else:
+        fut.set_exception(exc)
+
+
+class AsyncJournalStore:
+    # Keeps SQLite off the event loop. Writes are handed to one writer thread that
+    # folds whatever is pending into a single transaction (group commit) and only
+    # resolves the caller's future after the commit is durable. Reads run on a
+    # small pool of threads, each with its own connection.
+    _STOP = object()
+
+    def __init__(self, db_path: Path, read_workers: int = READ_WORKERS, max_batch: int = MAX_WRITE_BATCH):
+        self.db_path = Path(db_path)
+        self.max_batch = max_batch
+        # The writer thread opens the database and runs any migrations first;
+        # readers wait for that, so nothing here touches SQLite on the caller
+        self._ready = threading.Event()
+        self._open_error: Optional[BaseException] = None
+        self._writes: "queue.Queue" = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name="journal-writer", daemon=True)
+        self._writer.start()
+        self._readers = ThreadPoolExecutor(max_workers=read_workers, thread_name_prefix="journal-reader")
+        self._local = threading.local()
+        self._reader_stores: List[JournalStore] = []
+        self._reader_lock = threading.Lock()
+        # Built on first use from one snapshot read, then kept current by the writes below
+        self._user_index = UserIndex()
+        self._user_index_task: Optional["asyncio.Future"] = None
+
+    def _write_loop(self) -> None:
+        # synchronous=FULL: a commit is fsynced before anyone is told it's saved
+        try:
+            store = JournalStore(self.db_path, synchronous="FULL")
+        except Exception as e:
+            self._open_error = e
+            self._ready.set()
+            self._fail_writes(e)
+            return
+        self._ready.set()
+        try:
+            while True:
+                item = self._writes.get()
+                if item is self._STOP:
+                    return
+                batch = [item]
+                while len(batch) < self.max_batch:
+                    try:
+                        item = self._writes.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is self._STOP:
+                        self._writes.put(item)
+                        break
+                    batch.append(item)
+                # Consecutive writes of the same statement share one executemany
+                ops: List[Tuple[str, List[tuple]]] = []
+                for sql, rows, _, _ in batch:
+                    if ops and ops[-1][0] == sql:
+                        ops[-1][1].extend(rows)
+                    else:
+                        ops.append((sql, list(rows)))
+                exc: Optional[BaseException] = None
+                try:
+                    with METRICS.timer("journal_commit_seconds", "Group commit duration"):
+                        store.write_batch(ops)
+                except Exception as e:
+                    exc = e
+                METRICS.histogram(
+                    "journal_commit_batch", "Writes folded into one commit", COMMIT_BATCH_BUCKETS
+                ).observe(len(batch))
+                for _, _, fut, loop in batch:
+                    loop.call_soon_threadsafe(_settle, fut, exc)
+        finally:
+            store.close()
+
+    def _fail_writes(self, exc: BaseException) -> None:
+        # The database never opened: fail every write until close()
+        while True:
+            item = self._writes.get()
+            if item is self._STOP:
+                return
+            _, _, fut, loop = item
+            loop.call_soon_threadsafe(_settle, fut, exc)
+
+    async def wait_ready(self) -> None:
+        # Open and migration finished (raises what they raised)
+        if not self._ready.is_set():
+            await asyncio.to_thread(self._ready.wait)
+        if self._open_error is not None:
+            raise self._open_error
+
+    def _reader(self) -> JournalStore:
+        store = getattr(self._local, "store", None)
+        if store is None:
+            # Runs on a reader thread, so waiting here never blocks the loop
+            self._ready.wait()
+            if self._open_error is not None:
+                raise self._open_error
+            # check_same_thread=False only so close() can run from the owner thread
+            store = JournalStore(self.db_path, migrate=False, check_same_thread=False)
+            self._local.store = store
+            with self._reader_lock:
+                self._reader_stores.append(store)
+        return store
+
+    async def _read(self, method: str, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+
+        def call():
+            return getattr(self._reader(), method)(*args, **kwargs)
+
+        return await self._timed(method, loop.run_in_executor(self._readers, call))
+
+    async def _write(self, op: str, sql: str, rows: List[tuple]) -> None:
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._writes.put((sql, rows, fut, loop))
+        await self._timed(op, fut)
+
+    async def _timed(self, op: str, awaitable):
+        # Latency as the caller sees it, queueing included
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        except Exception:
+            METRICS.counter("journal_errors_total", "Failed journal operations", op=op).inc()
+            raise
+        finally:
+            METRICS.histogram("journal_op_seconds", "Journal operation latency", op=op).observe(time.perf_counter() - start)
+
+    async def add_entry(self, user_id: str, content: str) -> None:
+        await self._write("add_entry", INSERT_ENTRY_SQL, [_entry_row(user_id, content)])
+        self._user_index.add_id(user_id)
+
+    async def save_user_names(self, names: Mapping[str, str]) -> None:
+        await self._write("save_user_names", UPSERT_USER_SQL, _user_rows(names))
+        for user_id, name in names.items():
+            self._user_index.set_name(user_id, name)
+
+    async def user_index(self) -> UserIndex:
+        if self._user_index_task is None:
+            self._user_index_task = asyncio.ensure_future(self._load_user_index())
+        try:
+            await asyncio.shield(self._user_index_task)
+        except Exception:
+            # Let the next caller retry the load
+            self._user_index_task = None
+            raise
+        return self._user_index
+
+    async def _load_user_index(self) -> None:
+        user_ids = await self._read("distinct_user_ids")
+        names = await self._read("user_names")
+        self._user_index.load(user_ids, names)
+
+    async def user_names(self, user_ids: Iterable[str]) -> Dict[str, str]:
+        return await self._read("user_names", list(user_ids))
+
+    async def get_entries(
+        self,
+        requester_id: str,
+        admin_id: Optional[str],
+        target_user_id: Optional[str] = None,
+        date_str: Optional[str] = None,
+        days_ago: Optional[int] = None,
+    ) -> List[Tuple[int, str, Optional[int], str, str]]:
+        return await self._read("get_entries", requester_id, admin_id, target_user_id, date_str, days_ago)
+
+    async def get_page(self, *args, **kwargs) -> Tuple[List[Tuple[int, str, Optional[int], str, str]], bool]:
+        return await self._read("get_page", *args, **kwargs)
+
+    async def search(self, *args, **kwargs) -> List[Tuple[int, str, Optional[int], str, str]]:
+        return await self._read("search", *args, **kwargs)
+
+    async def count_entries(self, *args, **kwargs) -> int:
+        return await self._read("count_entries", *args, **kwargs)
+
+    async def distinct_user_ids(self) -> List[str]:
+        return await self._read("distinct_user_ids")
+
+    def close(self) -> None:
+        # Pending writes ahead of the sentinel are still committed
+        self._writes.put(self._STOP)
+        self._writer.join()
+        self._readers.shutdown(wait=True)
+        with self._reader_lock:
+            for store in self._reader_stores:
+                try:
+                    store.close()
+                except Exception:
+                    pass
+            self._reader_stores.clear()
+
+
+class UserNameResolver:
+    # user id -> display name for rendered pages. Hits come from an LRU with a
+    # TTL; misses try the gateway cache, then fetch_user, run concurrently under a
+    # cap with one in-flight lookup per id no matter how many pages ask for it.
+    # Resolved names are saved to the store; they also cover ids Discord won't resolve.
+    # Misses are cached too, briefly, so unknown ids don't hit the API on every page.
+    _MISS = object()
+
+    def __init__(
+        self,
+        bot,
+        store: Optional[AsyncJournalStore] = None,
+        max_size: int = NAME_CACHE_SIZE,
+        ttl: float = NAME_CACHE_TTL,
+        concurrency: int = NAME_FETCH_CONCURRENCY,
+        clock=time.monotonic,
+        miss_ttl: float = NAME_MISS_TTL,
+    ):
+        self.bot = bot
+        self.store = store
+        self.max_size = max_size
+        self.ttl = ttl
+        self.miss_ttl = miss_ttl
+        self.concurrency = concurrency
+        self._clock = clock
+        # None as the name marks a cached miss
+        self._cache: "OrderedDict[str, Tuple[Optional[str], float]]" = OrderedDict()
+        self._pending: Dict[str, "asyncio.Future"] = {}
+        self._unsaved: Dict[str, str] = {}
+        self._saves: set = set()
+        # Loop-bound; created on first use
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def _entry(self, user_id: str):
+        # The cached name, None for a cached miss, or _MISS when nothing is cached
+        entry = self._cache.get(user_id)
+        if entry is None:
+            return self._MISS
+        name, expires_at = entry
+        if expires_at <= self._clock():
+            del self._cache[user_id]
+            return self._MISS
+        self._cache.move_to_end(user_id)
+        return name
+
+    def cached(self, user_id: str) -> Optional[str]:
+        name = self._entry(user_id)
+        return None if name is self._MISS else name
+
+    def _remember(self, user_id: str, name: Optional[str]) -> None:
+        ttl = self.ttl if name is not None else self.miss_ttl
+        self._cache[user_id] = (name, self._clock() + ttl)
+        self._cache.move_to_end(user_id)
+        while len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+    async def resolve(self, user_id: str) -> Optional[str]:
+        name = self._entry(user_id)
+        if name is not self._MISS:
+            return name
+        pending = self._pending.get(user_id)
+        if pending is None:
+            pending = asyncio.ensure_future(self._lookup(user_id))
+            self._pending[user_id] = pending
+            pending.add_done_callback(lambda _f, uid=user_id: self._pending.pop(uid, None))
+        # Shielded so one caller giving up doesn't cancel the lookup for the others
+        return await asyncio.shield(pending)
+
+    async def _lookup(self, user_id: str) -> Optional[str]:
+        try:
+            int_uid = int(user_id)
+        except ValueError:
+            return None
+        user = self.bot.get_user(int_uid)
+        if user is None:
+            if self._semaphore is None:
+                self._semaphore = asyncio.Semaphore(self.concurrency)
+            async with self._semaphore:
+                try:
+                    user = await self.bot.fetch_user(int_uid)
+                except Exception:
+                    self._remember(user_id, None)
+                    return None
+        name = str(user)
+        self._remember(user_id, name)
+        self._unsaved[user_id] = name
+        return name
+
+    async def resolve_many(self, user_ids: Iterable[str]) -> Dict[str, str]:
+        # Every id maps to something printable; unresolvable ids map to themselves
+        user_ids = list(dict.fromkeys(user_ids))
+        found = await asyncio.gather(*(self.resolve(uid) for uid in user_ids))
+        names = {uid: name for uid, name in zip(user_ids, found) if name is not None}
+        missing = [uid for uid in user_ids if uid not in names]
+        if missing and self.store is not None:
+            try:
+                names.update(await self.store.user_names(missing))
+            except Exception:
+                pass
+        self._save_pending()
+        for uid in missing:
+            names.setdefault(uid, uid)
+        return names
+
+    def _save_pending(self) -> None:
+        # Persisting happens in the background; the page doesn't wait on the commit
+        if self.store is None or not self._unsaved:
+            return
+        names, self._unsaved = self._unsaved, {}
+        task = asyncio.ensure_future(self.store.save_user_names(names))
+        self._saves.add(task)
+        task.add_done_callback(self._saves.discard)
+
+    async def drain(self) -> None:
+        if self._saves:
+            await asyncio.gather(*self._saves, return_exceptions=True)
+
+
+# One-shot helpers for the CLI; long-running callers should hold a JournalStore
+def add_entry_db(db_path: Path, user_id: str, content: str) -> None:
+    with JournalStore(db_path) as store:
+        store.add_entry(user_id, content)
+
+
+def get_entries_db(
+    db_path: Path,
+    requester_id: str,
+    admin_id: Optional[str],
+    target_user_id: Optional[str] = None,
+    date_str: Optional[str] = None,
+    days_ago: Optional[int] = None,
+) -> List[Tuple[int, str, Optional[int], str, str]]:
+    with JournalStore(db_path) as store:
+        return store.get_entries(requester_id, admin_id, target_user_id, date_str, days_ago)
+
+
+def get_distinct_user_ids(db_path: Path) -> List[str]:
+    with JournalStore(db_path) as store:
+        return store.distinct_user_ids()
+
+
 def format_entry_row(row: Tuple[int, str, Optional[int], str, str], username: Optional[str] = None) -> str:
     _id, user_id, created_at_epoch, created_at_iso, content = row
     dt = None
@@ -203,6 +1203,108 @@ def _parse_prefix_options(content: str) -> Tuple[Optional[str], Optional[int], O
     return date, days, user, entries
 
 
+def _split_search_text(content: str) -> Tuple[str, str]:
+    # Separate option tokens from the free-text part of a prefix search
+    words = []
+    options = []
+    for token in content.split():
+        if token.startswith(("date:", "days:", "user:", "entries:")):
+            options.append(token)
+        else:
+            words.append(token)
+    return " ".join(words), " ".join(options)
+
+
+def _record_row(record: Mapping, number: int) -> Tuple[str, str, Optional[int], Optional[str], str]:
+    # One imported record -> insert row; timestamps and timezone are kept as given
+    try:
+        user_id = str(record["user_id"])
+        created_at = str(record["created_at"])
+        content = str(record["content"])
+    except KeyError as e:
+        raise ValueError(f"record {number}: missing field {e.args[0]!r}") from None
+    epoch = record.get("created_at_epoch")
+    if epoch is None or epoch == "":
+        dt = _parse_created_at(created_at)
+        epoch = int(dt.timestamp()) if dt is not None else None
+    else:
+        try:
+            epoch = int(epoch)
+        except (TypeError, ValueError):
+            raise ValueError(f"record {number}: bad created_at_epoch {epoch!r}") from None
+    return (user_id, created_at, epoch, record.get("timezone"), content)
+
+
+def _read_records(fp: IO[str], fmt: str) -> Iterator[Mapping]:
+    if fmt == "csv":
+        for record in csv.DictReader(fp):
+            yield {key: None if key in CSV_NULLABLE and value == CSV_NULL else value for key, value in record.items()}
+        return
+    for number, line in enumerate(fp, 1):
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"line {number}: {e}") from None
+
+
+def _write_records(fp: IO[str], fmt: str, rows: Iterable[tuple]) -> int:
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(fp)
+        writer.writerow(EXPORT_FIELDS)
+        for row in rows:
+            writer.writerow([
+                CSV_NULL if value is None and field in CSV_NULLABLE else value
+                for field, value in zip(EXPORT_FIELDS, row)
+            ])
+            count += 1
+        return count
+    for row in rows:
+        fp.write(json.dumps(dict(zip(EXPORT_FIELDS, row)), ensure_ascii=False))
+        fp.write("\n")
+        count += 1
+    return count
+
+
+def _io_format(path: str, fmt: Optional[str]) -> str:
+    if fmt:
+        return fmt
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def import_entries(db_path: Path, path: str, fmt: Optional[str] = None) -> int:
+    fmt = _io_format(path, fmt)
+    with JournalStore(db_path) as store:
+        if path == "-":
+            return store.import_rows(_record_row(r, n) for n, r in enumerate(_read_records(sys.stdin, fmt), 1))
+        with open(path, newline="", encoding="utf-8") as fp:
+            return store.import_rows(_record_row(r, n) for n, r in enumerate(_read_records(fp, fmt), 1))
+
+
+def export_entries(db_path: Path, path: str, fmt: Optional[str] = None) -> int:
+    fmt = _io_format(path, fmt)
+    with JournalStore(db_path) as store:
+        if path == "-":
+            return _write_records(sys.stdout, fmt, store.iter_rows())
+        with open(path, "w", newline="", encoding="utf-8") as fp:
+            return _write_records(fp, fmt, store.iter_rows())
+
+
+def _mark_last(items: Iterable[str]) -> Iterator[Tuple[str, bool]]:
+    # Pairs each item with whether it is the last, looking only one item ahead
+    items = iter(items)
+    try:
+        prev = next(items)
+    except StopIteration:
+        return
+    for item in items:
+        yield prev, False
+        prev = item
+    yield prev, True
+
+
 def read_entry_interactive() -> str:
     print("Enter your journal entry. Finish with an empty line:")
     lines = []
@@ -259,6 +1361,38 @@ def parse_args(argv=None):
         "--admin-id",
         help="Admin user ID for access control in retrieval.",
     )
+    parser.add_argument(
+        "--search",
+        help="Full-text search entries (bm25-ranked); combines with --get-date/--get-days.",
+    )
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=20,
+        help="Maximum results for --search (default: 20).",
+    )
+    parser.add_argument(
+        "--import",
+        dest="import_path",
+        metavar="PATH",
+        help="Bulk-import entries from a JSONL or CSV file ('-' for stdin).",
+    )
+    parser.add_argument(
+        "--export",
+        dest="export_path",
+        metavar="PATH",
+        help="Export all entries to a JSONL or CSV file ('-' for stdout).",
+    )
+    parser.add_argument(
+        "--format",
+        choices=("jsonl", "csv"),
+        help="Format for --import/--export (default: from the file extension, else jsonl).",
+    )
+    parser.add_argument(
+        "--explain",
+        action="store_true",
+        help="Print the SQLite query plan for the retrieval instead of the entries.",
+    )
     return parser.parse_args(argv)
 
 
@@ -266,22 +1400,72 @@ def main(argv=None) -> int:
     args = parse_args(argv)
     db_file = Path(args.db)
 
-    # Retrieval mode
-    if args.get_date or args.get_days is not None:
+    # Bulk import / export
+    if args.import_path:
+        try:
+            count = import_entries(db_file, args.import_path, args.format)
+        except (OSError, ValueError) as e:
+            print(f"Import failed, nothing imported: {e}", file=sys.stderr)
+            return 1
+        print(f"Imported {count} entries into {db_file}", file=sys.stderr)
+        return 0
+    if args.export_path:
+        count = export_entries(db_file, args.export_path, args.format)
+        print(f"Exported {count} entries from {db_file}", file=sys.stderr)
+        return 0
+
+    # Search mode
+    if args.search:
         requester = args.user or "cli"
-        rows = get_entries_db(
-            db_file,
-            requester_id=requester,
-            admin_id=args.admin_id,
-            target_user_id=args.target_user,
-            date_str=args.get_date,
-            days_ago=args.get_days,
-        )
+        with JournalStore(db_file) as store:
+            rows = store.search(
+                args.search,
+                requester_id=requester,
+                admin_id=args.admin_id,
+                target_user_id=args.target_user,
+                date_str=args.get_date,
+                days_ago=args.get_days,
+                limit=args.limit,
+            )
+            names = store.user_names({row[1] for row in rows})
         if not rows:
             print("No matching entries.")
             return 0
         for row in rows:
-            print(format_entry_row(row))
+            print(format_entry_row(row, username=names.get(row[1])))
+        return 0
+
+    # Retrieval mode
+    if args.get_date or args.get_days is not None:
+        requester = args.user or "cli"
+        if args.explain:
+            with JournalStore(db_file) as store:
+                for line in store.explain_entries(
+                    requester_id=requester,
+                    admin_id=args.admin_id,
+                    target_user_id=args.target_user,
+                    date_str=args.get_date,
+                    days_ago=args.get_days,
+                ):
+                    print(line)
+            return 0
+        found = False
+        with JournalStore(db_file) as store:
+            # Names the bot has resolved before; unknown users print as their id
+            names: Dict[str, Optional[str]] = {}
+            for row in store.iter_entries(
+                requester_id=requester,
+                admin_id=args.admin_id,
+                target_user_id=args.target_user,
+                date_str=args.get_date,
+                days_ago=args.get_days,
+            ):
+                found = True
+                if row[1] not in names:
+                    names[row[1]] = store.user_names([row[1]]).get(row[1])
+                print(format_entry_row(row, username=names[row[1]]))
+        if not found:
+            print("No matching entries.")
         return 0
 
     # Add mode
@@ -309,16 +1493,33 @@ if commands is not None:
             self.bot = bot
             self.db_path = db_path
             self.admin_id = admin_id
+            # Opened (and migrated) once for the life of the bot, on the store's
+            # writer thread; all SQLite work stays off the event loop
+            self.store = AsyncJournalStore(db_path)
+            self.names = UserNameResolver(bot, store=self.store)
+
+        async def cog_load(self) -> None:
+            # A failed open or migration fails add_cog instead of every command
+            await self.store.wait_ready()
+            # Warm the autocomplete index so the first keystroke doesn't pay for the load
+            try:
+                await self.store.user_index()
+            except Exception:
+                pass
+
+        async def cog_unload(self) -> None:
+            await self.names.drain()
+            await asyncio.to_thread(self.store.close)
 
         class _JournalModal(discord.ui.Modal):
-            def __init__(self, db_path: Path):
+            def __init__(self, store: AsyncJournalStore):
                 super().__init__(title="Journal entry")
-                self.db_path = db_path
+                self.store = store
                 self.entry = discord.ui.TextInput(label="Entry", style=discord.TextStyle.long, required=True, max_length=4000)
                 self.add_item(self.entry)
 
             async def on_submit(self, interaction: discord.Interaction) -> None:  # type: ignore
-                add_entry_db(self.db_path, str(interaction.user.id), self.entry.value)
+                await self.store.add_entry(str(interaction.user.id), self.entry.value)
                 try:
                     await interaction.response.send_message("Journal entry saved.", ephemeral=True)
                 except Exception:
@@ -344,7 +1545,7 @@ if commands is not None:
                 return
 
             # Save entry
-            add_entry_db(self.db_path, author_id, entry)
+            await self.store.add_entry(author_id, entry)
 
             # Prefix behavior: delete the invoking message (if possible) and show a short confirmation
             try:
@@ -397,15 +1598,15 @@ if commands is not None:
             # If requester isn't admin, ignore any user filter
             if requester != (admin_id_norm or ""):
                 user = None
-            rows = get_entries_db(
-                self.db_path,
-                requester_id=requester,
-                admin_id=admin_id_norm,
-                target_user_id=user,
-                date_str=date,
-                days_ago=days,
-            )
-            # Debug logs removed
+            query = _PageQuery(requester, admin_id_norm, user, date, days)
+            # Page size: default 5; entries<=0 asks for as much as one page allows
+            if entries is None:
+                page_size = DEFAULT_PAGE_SIZE
+            elif entries <= 0:
+                page_size = MAX_PAGE_SIZE
+            else:
+                page_size = min(entries, MAX_PAGE_SIZE)
+            rows, has_older = await self.store.get_page(*query, limit=page_size)
             if not rows:
                 # Ephemeral for slash, short message for prefix
                 if getattr(ctx, "interaction", None) is not None:
@@ -420,92 +1621,86 @@ if commands is not None:
                     except Exception:
                         pass
                 return
-            # Determine how many rows to show. Default is 5; entries<=0 means show all
-            if entries is None:
-                max_rows = 5
-            elif entries <= 0:
-                max_rows = len(rows)
-            else:
-                max_rows = entries
-            shown = rows[:max_rows]
-            # Resolve user ids to readable names where possible to improve output
-            user_ids = {r[1] for r in shown}
-            user_map = {}
-            for uid in user_ids:
-                try:
-                    int_uid = int(uid)
-                except Exception:
-                    user_map[uid] = uid
-                    continue
-                user = None
-                # try cache via get_user
-                try:
-                    user = self.bot.get_user(int_uid) if hasattr(self, 'bot') else None
-                except Exception:
-                    user = None
-                if user is None:
-                    try:
-                        user = await self.bot.fetch_user(int_uid)  # type: ignore
-                    except Exception:
-                        user = None
-                user_map[uid] = str(user) if user is not None else uid
-
-            # Build message chunks to fit under Discord's 2000-character limit.
-            parts = [format_entry_row(r, username=user_map.get(r[1])) for r in shown]
-            suffix = "" if len(rows) <= max_rows else f"\n...and {len(rows) - max_rows} more."
-
-            MAX_LEN = 2000
-            chunks: List[str] = []
-            cur = ""
-            for p in parts:
-                candidate = (cur + "\n\n" + p) if cur else p
-                if len(candidate) > MAX_LEN:
-                    if cur:
-                        chunks.append(cur)
-                        cur = p
-                        # If a single part still exceeds MAX_LEN, forcibly split it
-                        if len(cur) > MAX_LEN:
-                            for i in range(0, len(cur), MAX_LEN):
-                                chunks.append(cur[i : i + MAX_LEN])
-                            cur = ""
-                    else:
-                        # current empty, part itself is too large: split it
-                        for i in range(0, len(p), MAX_LEN):
-                            chunks.append(p[i : i + MAX_LEN])
-                        cur = ""
-                else:
-                    cur = candidate
-            if cur:
-                chunks.append(cur)
-
-            # Attach suffix to the last chunk when possible, otherwise append as its own chunk
-            if suffix:
-                if not chunks:
-                    chunks = [suffix]
-                else:
-                    if len(chunks[-1]) + len(suffix) <= MAX_LEN:
-                        chunks[-1] = chunks[-1] + suffix
-                    else:
-                        chunks.append(suffix)
+            # Only count when there is something past this page
+            remaining = 0
+            if has_older:
+                remaining = await self.store.count_entries(*query) - len(rows)
+            chunks = await self._render_page(rows, remaining)
+            view = self._JournalPageView(self, query, page_size, rows, has_older=has_older, has_newer=False) if has_older else None
 
             # Send chunks appropriately: first response (if available), then followups; for prefix sends, send sequentially.
             if getattr(ctx, "interaction", None) is not None:
-                if not ctx.interaction.response.is_done():
-                    # First chunk must use response.send_message
-                    await ctx.interaction.response.send_message(chunks[0], ephemeral=True)
-                    for chunk in chunks[1:]:
-                        await ctx.interaction.followup.send(chunk, ephemeral=True)
-                else:
-                    for chunk in chunks:
-                        await ctx.interaction.followup.send(chunk, ephemeral=True)
+                await self._send_interaction_chunks(ctx.interaction, chunks, view)
             else:
-                for chunk in chunks:
-                    msg = await ctx.send(chunk)
+                for chunk, last in _mark_last(chunks):
+                    msg = await ctx.send(chunk, view=view) if view is not None and last else await ctx.send(chunk)
                     try:
                         await msg.delete(delay=GET_RESULT_DELETE_DELAY)
                     except Exception:
                         pass
 
+        async def _render_page(self, rows: List[Tuple[int, str, Optional[int], str, str]], remaining: int) -> Iterator[str]:
+            # Resolve user ids to readable names where possible to improve output
+            user_map = await self.names.resolve_many(r[1] for r in rows)
+            # Chunks under Discord's 2000-character limit, produced as they are sent
+            parts = (format_entry_row(r, username=user_map.get(r[1])) for r in rows)
+            suffix = f"\n...and {remaining} more." if remaining > 0 else ""
+            return iter_chunks(parts, tail=suffix)
+
+        async def _send_interaction_chunks(self, interaction, chunks: Iterable[str], view=None) -> None:
+            # The page buttons ride on the last chunk
+            for chunk, last in _mark_last(chunks):
+                kwargs = {"ephemeral": True}
+                if view is not None and last:
+                    kwargs["view"] = view
+                if not interaction.response.is_done():
+                    # First chunk must use response.send_message
+                    await interaction.response.send_message(chunk, **kwargs)
+                else:
+                    await interaction.followup.send(chunk, **kwargs)
+
+        async def _send_page(
+            self,
+            interaction,
+            query: "_PageQuery",
+            page_size: int,
+            before: Optional[Tuple[Optional[int], int]] = None,
+            after: Optional[Tuple[Optional[int], int]] = None,
+        ) -> None:
+            rows, more = await self.store.get_page(*query, limit=page_size, before=before, after=after)
+            if not rows:
+                await interaction.response.send_message("No more journal entries.", ephemeral=True)
+                return
+            # Moving older means a newer page exists, and vice versa
+            has_older = more if after is None else True
+            has_newer = more if after is not None else True
+            chunks = await self._render_page(rows, 0)
+            view = self._JournalPageView(self, query, page_size, rows, has_older=has_older, has_newer=has_newer)
+            await self._send_interaction_chunks(interaction, chunks, view)
+
+        class _JournalPageView(discord.ui.View):
+            def __init__(self, cog, query: "_PageQuery", page_size: int, rows, has_older: bool, has_newer: bool):
+                super().__init__(timeout=PAGE_VIEW_TIMEOUT)
+                self.cog = cog
+                self.query = query
+                self.page_size = page_size
+                self.newest_key = _page_key(rows[0])
+                self.oldest_key = _page_key(rows[-1])
+                self.newer.disabled = not has_newer
+                self.older.disabled = not has_older
+
+            async def interaction_check(self, interaction: discord.Interaction) -> bool:  # type: ignore
+                # Only the person who ran the query may page through it
+                return str(interaction.user.id) == self.query.requester_id
+
+            @discord.ui.button(label="Newer", style=discord.ButtonStyle.secondary)
+            async def newer(self, interaction: discord.Interaction, button: discord.ui.Button) -> None:  # type: ignore
+                await self.cog._send_page(interaction, self.query, self.page_size, after=self.newest_key)
+
+            @discord.ui.button(label="Older", style=discord.ButtonStyle.secondary)
+            async def older(self, interaction: discord.Interaction, button: discord.ui.Button) -> None:  # type: ignore
+                await self.cog._send_page(interaction, self.query, self.page_size, before=self.oldest_key)
+
         @journal_get.autocomplete("user")
         async def journal_get_user_autocomplete(
             self,
@@ -521,13 +1716,74 @@ if commands is not None:
             if author_id != (admin_id_norm or ""):
                 return []
             from discord import app_commands as ac
-            # Suggest distinct user_ids from DB filtered by current prefix
-            user_ids = get_distinct_user_ids(self.db_path)
-            if current:
-                user_ids = [u for u in user_ids if u.startswith(current)]
-            # Limit suggestions
-            suggestions = user_ids[:25]
-            return [ac.Choice(name=u, value=u) for u in suggestions]
+            # Suggest user ids (or known usernames) starting with the current text
+            index = await self.store.user_index()
+            choices = []
+            for uid in index.search(_normalize_user_id(current) or "", limit=25):
+                name = index.name(uid)
+                label = f"{name} ({uid})" if name else uid
+                choices.append(ac.Choice(name=label[:100], value=uid))
+            return choices
+
+        @commands.hybrid_command(name="journal_search")
+        @app_commands.describe(
+            query="Words to search for (end a word with * for prefix match)",
+            date="Calendar date (YYYY-MM-DD)",
+            days="Entries since N days ago (0 = today)",
+            user="Admin only: target user ID",
+            entries="Number of results to return (default 5)",
+        )
+        async def journal_search(
+            self,
+            ctx,
+            query: str,
+            date: Optional[str] = None,
+            days: Optional[int] = None,
+            user: Optional[str] = None,
+            entries: Optional[int] = None,
+        ):
+            requester = str(ctx.author.id)
+            admin_id_norm = _normalize_user_id(self.admin_id)
+            user = _normalize_user_id(user)
+
+            # Prefix form: option tokens (date:, days:, user:, entries:) anywhere, the rest is the query
+            if getattr(ctx, "interaction", None) is None and ctx.message:
+                msg_content = ctx.message.content or ""
+                parts = msg_content.split(maxsplit=1)
+                arg_text = parts[1] if len(parts) > 1 else ""
+                query, option_text = _split_search_text(arg_text)
+                date, days, user, p_entries = _parse_prefix_options(option_text)
+                user = _normalize_user_id(user)
+                if p_entries is not None:
+                    entries = p_entries
+
+            if requester != (admin_id_norm or ""):
+                user = None
+            limit = DEFAULT_SEARCH_RESULTS if entries is None or entries <= 0 else min(entries, MAX_PAGE_SIZE)
+            rows = await self.store.search(
+                query,
+                requester_id=requester,
+                admin_id=admin_id_norm,
+                target_user_id=user,
+                date_str=date,
+                days_ago=days,
+                limit=limit,
+            )
+            chunks = await self._render_page(rows, 0) if rows else iter(["No matching journal entries."])
+            if getattr(ctx, "interaction", None) is not None:
+                await self._send_interaction_chunks(ctx.interaction, chunks)
+            else:
+                delay = GET_RESULT_DELETE_DELAY if rows else AUTO_DELETE_DELAY
+                for chunk in chunks:
+                    msg = await ctx.send(chunk)
+                    try:
+                        await msg.delete(delay=delay)
+                    except Exception:
+                        pass
+
+        @journal_search.autocomplete("user")
+        async def journal_search_user_autocomplete(self, interaction, current: str):
+            return await self.journal_get_user_autocomplete(interaction, current)
 else:
     JournalCog = None  # type: ignore
 
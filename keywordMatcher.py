@@ -0,0 +1,82 @@
+from collections import deque
+from typing import Dict, List, Optional, Sequence, Set
+
+# Multi-keyword matcher for the Reddit filters. Every keyword from every group is
+# compiled once into a single Aho-Corasick automaton, so a title is lowercased
+# once and scanned once no matter how many keywords are configured.
+
+
+class KeywordMatcher:
+    def __init__(self, groups: Sequence[Sequence[str]], names: Optional[Sequence[str]] = None):
+        self.groups = [list(group) for group in groups]
+        self.names = list(names) if names is not None else [str(i) for i in range(len(self.groups))]
+        if len(self.names) != len(self.groups):
+            raise ValueError("names must line up with groups")
+
+        # An empty keyword matches every title (same as `'' in title`)
+        self._always = [any(kw == "" for kw in group) for group in self.groups]
+
+        # Trie: goto transitions, failure links and output (keyword, group) pairs
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[tuple]] = [[]]
+        for group_index, group in enumerate(self.groups):
+            for keyword in group:
+                if keyword:
+                    self._insert(keyword.lower(), keyword, group_index)
+        self._build_failure_links()
+
+    def _insert(self, pattern: str, keyword: str, group_index: int) -> None:
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((keyword, group_index))
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(ch, 0)
+                self._fail[nxt] = target if target != nxt else 0
+                # Inherit outputs so overlapping/suffix keywords are all reported
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def hits(self, text: str) -> Dict[str, Set[str]]:
+        # Keywords found in text, keyed by group name
+        found: Dict[str, Set[str]] = {name: set() for name in self.names}
+        for group_index, always in enumerate(self._always):
+            if always:
+                found[self.names[group_index]].add("")
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for ch in text.lower():
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for keyword, group_index in out[state]:
+                found[self.names[group_index]].add(keyword)
+        return found
+
+    def match(self, text: str) -> Optional[Dict[str, Set[str]]]:
+        # AND across groups: None unless every group has at least one hit
+        found = self.hits(text)
+        if all(found[name] for name in self.names):
+            return found
+        return None
+
+
+def describe_hits(found: Dict[str, Set[str]]) -> str:
+    keywords = sorted({kw for hits in found.values() for kw in hits if kw})
+    return ", ".join(keywords)
@@ -0,0 +1,114 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from typing import Callable, Optional
+
+from metrics import METRICS
+
+# Detects synchronous work blocking the event loop. A heartbeat coroutine wakes
+# every `interval` and records how late it was; a separate thread watches the
+# heartbeat and, when it goes quiet for longer than `threshold`, grabs the loop
+# thread's stack while the blocking call is still on it. That is the moment
+# that matters: once the loop recovers, the culprit is gone from the stack.
+
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_INTERVAL = 0.05
+# At most one stack dump per this many seconds; the rest are counted
+DEFAULT_REPORT_EVERY = 60.0
+LAG_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _describe_task(task: Optional[asyncio.Task]) -> str:
+    if task is None:
+        return "no task (plain callback)"
+    coro = task.get_coro()
+    name = getattr(coro, "__qualname__", None) or repr(coro)
+    return f"task {task.get_name()} ({name})"
+
+
+class LoopWatchdog:
+    def __init__(
+        self,
+        threshold: float = DEFAULT_THRESHOLD,
+        interval: float = DEFAULT_INTERVAL,
+        report_every: float = DEFAULT_REPORT_EVERY,
+        log: Callable[[str], None] = print,
+    ):
+        self.threshold = threshold
+        self.interval = interval
+        self.report_every = report_every
+        self.log = log
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._beat = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._last_report = float("-inf")
+        self._suppressed = 0
+
+    @property
+    def started(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.started:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._stopping.clear()
+        self._task = self._loop.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._monitor, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._thread is not None:
+            await asyncio.to_thread(self._thread.join)
+            self._thread = None
+
+    async def _heartbeat(self) -> None:
+        lag_hist = METRICS.histogram("event_loop_lag_seconds", "How late the loop woke a sleeping coroutine", LAG_BUCKETS)
+        stalls = METRICS.counter("event_loop_stalls_total", "Times the loop was blocked past the threshold")
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._beat = now
+            lag = max(0.0, now - start - self.interval)
+            lag_hist.observe(lag)
+            if lag >= self.threshold:
+                stalls.inc()
+
+    def _monitor(self) -> None:
+        reported_beat = None
+        while not self._stopping.wait(self.interval):
+            beat = self._beat
+            stalled = time.monotonic() - beat
+            # One capture per stall: the heartbeat value identifies it
+            if stalled < self.threshold or beat == reported_beat:
+                continue
+            reported_beat = beat
+            self._report(stalled)
+
+    def _report(self, stalled: float) -> None:
+        now = time.monotonic()
+        if now - self._last_report < self.report_every:
+            self._suppressed += 1
+            return
+        frame = sys._current_frames().get(self._loop_thread)
+        if frame is None:
+            return
+        stack = "".join(traceback.format_stack(frame))
+        task = asyncio.current_task(self._loop) if self._loop is not None else None
+        suppressed = f" ({self._suppressed} more stalls since the last report)" if self._suppressed else ""
+        self._last_report = now
+        self._suppressed = 0
+        self.log(f"Event loop blocked for {stalled:.2f}s+ in {_describe_task(task)}{suppressed}:\n{stack}")
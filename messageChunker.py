@@ -0,0 +1,72 @@
+import unicodedata
+from typing import Iterable, Iterator, List
+
+# Packs text into Discord-sized messages. Input is consumed lazily and every
+# chunk is yielded as soon as it is full, so callers can send while later rows
+# are still being produced. Each character is copied a constant number of
+# times, so the cost is linear in the total text length.
+
+MAX_MESSAGE_LEN = 2000
+PART_SEPARATOR = "\n\n"
+# Preferred places to break an oversized part, best first
+SPLIT_BOUNDARIES = ("\n\n", "\n", " ")
+
+
+def _find_cut(text: str, start: int, end: int) -> int:
+    # Latest boundary in text[start:end]. Boundaries in the first half of the
+    # window are skipped so a split doesn't leave a tiny fragment behind.
+    floor = start + (end - start) // 2
+    for boundary in SPLIT_BOUNDARIES:
+        cut = text.rfind(boundary, floor, end)
+        if cut > start:
+            return cut
+    # No boundary: cut at the limit, but not between a character and its combining marks
+    cut = end
+    while cut > start + 1 and unicodedata.combining(text[cut]):
+        cut -= 1
+    return cut
+
+
+def split_text(text: str, limit: int = MAX_MESSAGE_LEN) -> Iterator[str]:
+    start = 0
+    length = len(text)
+    while length - start > limit:
+        cut = _find_cut(text, start, start + limit)
+        yield text[start:cut]
+        start = cut
+        while start < length and text[start] in "\n ":
+            start += 1
+    if start < length:
+        yield text[start:]
+
+
+def iter_chunks(
+    parts: Iterable[str],
+    limit: int = MAX_MESSAGE_LEN,
+    separator: str = PART_SEPARATOR,
+    tail: str = "",
+) -> Iterator[str]:
+    # Join parts with separator into chunks of at most limit characters. Parts
+    # that are too long on their own are split on paragraph, line or word
+    # boundaries. tail is appended to the last chunk, or sent alone if it won't fit.
+    pending: List[str] = []
+    size = 0
+    sep_len = len(separator)
+    for part in parts:
+        # Most parts fit as they are; skip the splitter for those
+        pieces = (part,) if len(part) <= limit else split_text(part, limit)
+        for piece in pieces:
+            if not piece:
+                continue
+            if pending and size + sep_len + len(piece) > limit:
+                yield separator.join(pending)
+                pending, size = [], 0
+            size += len(piece) + (sep_len if pending else 0)
+            pending.append(piece)
+    last = separator.join(pending)
+    if tail and size + len(tail) <= limit:
+        last, tail = last + tail, ""
+    if last:
+        yield last
+    if tail:
+        yield tail
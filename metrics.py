@@ -0,0 +1,252 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+# In-process counters and histograms for the watchers, the notifier and the
+# journal store. Recording is a dict lookup plus an increment under a lock, so
+# it is cheap enough for every fetch and every query; render_prometheus()
+# exports the lot in Prometheus text format and summary lines feed /stats.
+
+# Seconds: sub-millisecond SQLite reads up to slow page loads
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+# How late a watcher started against its scheduled time
+DRIFT_BUCKETS = (0.001, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0, 120.0)
+
+DEFAULT_METRICS_HOST = "127.0.0.1"
+
+# The watcher a coroutine is working for; tasks inherit it, so fetches made
+# inside a watcher run are labelled without threading the name through
+current_watcher: ContextVar[str] = ContextVar("current_watcher", default="")
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Counter:
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class Gauge:
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        # One slot per bucket plus +Inf; not cumulative (render sums them)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        # Upper bound of the bucket holding the q-th observation
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+
+class _Family(NamedTuple):
+    kind: str
+    help: str
+    buckets: Tuple[float, ...]
+    children: Dict[Labels, object]
+
+
+def _labels(labels: Dict[str, object]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._families: Dict[str, _Family] = {}
+        self._lock = threading.Lock()
+
+    def _child(self, kind: str, name: str, help: str, buckets: Tuple[float, ...], labels: Dict[str, object]):
+        key = _labels(labels)
+        family = self._families.get(name)
+        if family is None or key not in family.children:
+            with self._lock:
+                family = self._families.get(name)
+                if family is None:
+                    family = self._families[name] = _Family(kind, help, buckets, {})
+                if family.kind == kind and key not in family.children:
+                    if kind == "histogram":
+                        family.children[key] = Histogram(family.buckets)
+                    else:
+                        family.children[key] = Counter() if kind == "counter" else Gauge()
+        if family.kind != kind:
+            raise ValueError(f"metric {name} is a {family.kind}, not a {kind}")
+        return family.children[key]
+
+    def counter(self, name: str, help: str = "", **labels) -> Counter:
+        return self._child("counter", name, help, (), labels)
+
+    def gauge(self, name: str, help: str = "", **labels) -> Gauge:
+        return self._child("gauge", name, help, (), labels)
+
+    def histogram(self, name: str, help: str = "", buckets: Tuple[float, ...] = DEFAULT_BUCKETS, **labels) -> Histogram:
+        return self._child("histogram", name, help, buckets, labels)
+
+    @contextmanager
+    def timer(self, name: str, help: str = "", **labels) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.histogram(name, help, **labels).observe(time.perf_counter() - start)
+
+    def find(self, name: str, **labels) -> Optional[object]:
+        # Existing series only; reading never creates one
+        family = self._families.get(name)
+        return family.children.get(_labels(labels)) if family is not None else None
+
+    def series(self, name: str) -> List[Tuple[Dict[str, str], object]]:
+        family = self._families.get(name)
+        if family is None:
+            return []
+        return [(dict(labels), metric) for labels, metric in list(family.children.items())]
+
+    def render_prometheus(self) -> str:
+        lines: List[str] = []
+        for name, family in sorted(self._families.items()):
+            if family.help:
+                lines.append(f"# HELP {name} {family.help}")
+            lines.append(f"# TYPE {name} {family.kind}")
+            for labels, metric in sorted(family.children.items()):
+                if isinstance(metric, Histogram):
+                    cumulative = 0
+                    for bound, n in zip(metric.buckets + (float("inf"),), metric.counts):
+                        cumulative += n
+                        le = (("le", _format_value(bound)),)
+                        lines.append(f"{name}_bucket{_format_labels(labels, le)} {cumulative}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(metric.sum)}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {metric.count}")
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(metric.value)}")
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide registry shared by every module
+METRICS = MetricsRegistry()
+
+
+async def start_metrics_server(port: int, host: str = DEFAULT_METRICS_HOST, registry: MetricsRegistry = METRICS):
+    # Serves GET /metrics on localhost; returns the runner so the caller can cleanup()
+    from aiohttp import web
+
+    async def handle(request):
+        return web.Response(text=registry.render_prometheus(), content_type="text/plain", charset="utf-8")
+
+    app = web.Application()
+    app.router.add_get("/metrics", handle)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+def _ms(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "-"
+    if seconds == float("inf"):
+        return ">max"
+    return f"{seconds * 1000:.0f}ms" if seconds >= 0.01 else f"{seconds * 1000:.1f}ms"
+
+
+def summary_lines(registry: MetricsRegistry = METRICS) -> List[str]:
+    # Human-readable digest for /stats: one line per watcher, journal op and channel
+    lines: List[str] = []
+
+    def value(name: str, **labels) -> int:
+        metric = registry.find(name, **labels)
+        return int(metric.value) if metric is not None else 0
+
+    def quantile(name: str, q: float, **labels) -> Optional[float]:
+        metric = registry.find(name, **labels)
+        return metric.quantile(q) if metric is not None else None
+
+    runs = registry.series("watcher_run_seconds")
+    if runs:
+        lines.append("Watchers (runs, errors, p50/p95 run, p95 fetch, alerts, dedup hits, drift p95):")
+    for labels, hist in sorted(runs, key=lambda item: item[0].get("watcher", "")):
+        watcher = labels.get("watcher", "")
+        errors = sum(int(c.value) for l, c in registry.series("watcher_errors_total") if l.get("watcher") == watcher)
+        lines.append(
+            f"  {watcher}: {hist.count} runs, {errors} err, {_ms(hist.quantile(0.5))}/{_ms(hist.quantile(0.95))}, "
+            f"fetch {_ms(quantile('fetch_seconds', 0.95, watcher=watcher))}, "
+            f"{value('watcher_alerts_total', watcher=watcher)} alerts, "
+            f"{value('watcher_dedup_hits_total', watcher=watcher)} dedup, "
+            f"drift {_ms(quantile('watcher_drift_seconds', 0.95, watcher=watcher))}"
+        )
+
+    ops = registry.series("journal_op_seconds")
+    if ops:
+        lines.append("Journal (calls, p50/p99):")
+    for labels, hist in sorted(ops, key=lambda item: item[0].get("op", "")):
+        lines.append(f"  {labels.get('op', '')}: {hist.count}, {_ms(hist.quantile(0.5))}/{_ms(hist.quantile(0.99))}")
+
+    sends = registry.series("discord_send_seconds")
+    if sends:
+        total = Histogram()
+        for _, hist in sends:
+            for i, n in enumerate(hist.counts):
+                total.counts[i] += n
+            total.count += hist.count
+        failed = sum(int(c.value) for _, c in registry.series("notifier_failures_total"))
+        lines.append(f"Discord sends: {total.count}, p50/p95 {_ms(total.quantile(0.5))}/{_ms(total.quantile(0.95))}, {failed} failed")
+
+    lag = registry.find("event_loop_lag_seconds")
+    if lag is not None:
+        lines.append(
+            f"Event loop lag: p50/p99 {_ms(lag.quantile(0.5))}/{_ms(lag.quantile(0.99))}, "
+            f"{value('event_loop_stalls_total')} stalls"
+        )
+    return lines or ["No metrics recorded yet."]
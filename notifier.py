@@ -0,0 +1,178 @@
+import asyncio
+import time
+from itertools import accumulate
+from typing import Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from messageChunker import MAX_MESSAGE_LEN, iter_chunks
+from metrics import METRICS
+
+# Notification pipeline between the watchers and channel.send. Watchers enqueue
+# and return immediately; one sender task coalesces whatever is queued into as
+# few Discord messages as fit under the length limit, paced per channel.
+
+MESSAGE_SEPARATOR = "\n\n"
+DEFAULT_QUEUE_SIZE = 500
+DEFAULT_COALESCE_WINDOW = 1.0
+# Discord allows roughly 5 messages per 5 seconds per channel
+DEFAULT_BUCKET_CAPACITY = 5
+DEFAULT_BUCKET_REFILL = 1.0
+
+
+class Notification(NamedTuple):
+    channel_id: int
+    messages: List[str]
+    label: str = ""
+    # Called if delivery fails, e.g. to un-mark posts in the dedup store
+    on_failed: Optional[Callable[[], None]] = None
+
+
+class TokenBucket:
+    def __init__(self, capacity: float, refill_per_sec: float):
+        self.capacity = capacity
+        self.refill_per_sec = refill_per_sec
+        self.tokens = capacity
+        self._updated: Optional[float] = None
+
+    def _refill(self, now: float) -> None:
+        if self._updated is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.refill_per_sec)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._refill(loop.time())
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.refill_per_sec)
+
+
+def pack_messages(messages: List[str], limit: int = MAX_MESSAGE_LEN, separator: str = MESSAGE_SEPARATOR) -> List[str]:
+    return list(iter_chunks(messages, limit, separator))
+
+
+def pack_with_progress(
+    messages: List[str], limit: int = MAX_MESSAGE_LEN, separator: str = MESSAGE_SEPARATOR
+) -> List[Tuple[str, int]]:
+    # (chunk, how many leading messages are complete once it and the chunks
+    # before it are sent). iter_chunks emits a full chunk while holding the
+    # message that did not fit, so that one is not counted yet.
+    read = 0
+
+    def counted(items: Iterable[str]) -> Iterator[str]:
+        nonlocal read
+        for message in items:
+            read += 1
+            yield message
+
+    packed = [(chunk, read - 1) for chunk in iter_chunks(counted(messages), limit, separator)]
+    if packed:
+        # The last chunk is emitted after every message has been read
+        packed[-1] = (packed[-1][0], len(messages))
+    return packed
+
+
+class Notifier:
+    def __init__(
+        self,
+        bot,
+        queue_size: int = DEFAULT_QUEUE_SIZE,
+        coalesce_window: float = DEFAULT_COALESCE_WINDOW,
+        bucket_capacity: float = DEFAULT_BUCKET_CAPACITY,
+        bucket_refill: float = DEFAULT_BUCKET_REFILL,
+    ):
+        self.bot = bot
+        self.queue_size = queue_size
+        self.coalesce_window = coalesce_window
+        self.bucket_capacity = bucket_capacity
+        self.bucket_refill = bucket_refill
+        self._buckets: Dict[int, TokenBucket] = {}
+        # Loop-bound; created in start()
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def started(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> asyncio.Task:
+        if not self.started:
+            if self._queue is None:
+                self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return self._task
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    def submit(self, notification: Notification) -> bool:
+        # Never blocks the caller; a full queue drops the batch and reports failure
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+        try:
+            self._queue.put_nowait(notification)
+            return True
+        except asyncio.QueueFull:
+            METRICS.counter("notifier_failures_total", "Notifications not delivered", reason="queue_full").inc()
+            print(f"Notification queue full, dropping {notification.label or 'alert'}.")
+            if notification.on_failed is not None:
+                notification.on_failed()
+            return False
+
+    def _bucket(self, channel_id: int) -> TokenBucket:
+        bucket = self._buckets.get(channel_id)
+        if bucket is None:
+            bucket = self._buckets[channel_id] = TokenBucket(self.bucket_capacity, self.bucket_refill)
+        return bucket
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            if self.coalesce_window:
+                # Let the rest of this poll window land before sending
+                await asyncio.sleep(self.coalesce_window)
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            by_channel: Dict[int, List[Notification]] = {}
+            for item in batch:
+                by_channel.setdefault(item.channel_id, []).append(item)
+            for channel_id, items in by_channel.items():
+                await self._deliver(channel_id, items)
+
+    async def _deliver(self, channel_id: int, items: List[Notification]) -> None:
+        chunks = pack_with_progress([m for item in items for m in item.messages])
+        # Item i is delivered once the first ends[i] messages are sent
+        ends = list(accumulate(len(item.messages) for item in items))
+        bucket = self._bucket(channel_id)
+        sent = 0
+        try:
+            channel = self.bot.get_channel(channel_id)
+            if channel is None:
+                raise LookupError(f"channel {channel_id} not found")
+            for chunk, complete in chunks:
+                await bucket.acquire()
+                await self._send(channel, chunk)
+                sent = complete
+        except Exception as e:
+            # Only what did not fully go out is rolled back (and retried next poll)
+            failed = [item for item, end in zip(items, ends) if end > sent]
+            METRICS.counter("notifier_failures_total", "Notifications not delivered", reason=type(e).__name__).inc(len(failed))
+            print(f"Failed to deliver notification: {e}")
+            for item in failed:
+                if item.on_failed is not None:
+                    item.on_failed()
+            items = [item for item, end in zip(items, ends) if end <= sent]
+        for item in items:
+            if item.label:
+                print(f"{item.label} Message Sent.")
+
+    async def _send(self, channel, content: str) -> None:
+        # discord.py waits out 429s inside its HTTP client, so a rate limit shows
+        # up here as a slow send rather than an exception
+        start = time.perf_counter()
+        await channel.send(content)
+        METRICS.histogram("discord_send_seconds", "channel.send latency", channel=channel.id).observe(time.perf_counter() - start)
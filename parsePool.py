@@ -0,0 +1,69 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional, TypeVar
+
+from metrics import METRICS, current_watcher
+
+# Optional process pool for HTML parsing. BeautifulSoup is pure-Python CPU
+# work; run on the loop thread, watchers that fire together parse one after
+# another on one core. Workers get the raw body and return the parser's small
+# result (posts, a price, a stock flag), so only bytes and that result cross
+# the process boundary. Parsers must be module-level functions (or partials of
+# them) so they can be pickled, and the bot's entry point must be guarded by
+# `if __name__ == "__main__"` since workers re-import the main module.
+
+DEFAULT_PARSE_WORKERS = 0
+# Below this many bytes the IPC round trip costs more than the parse
+DEFAULT_INLINE_BELOW = 64 * 1024
+
+T = TypeVar("T")
+
+
+def _pool_context():
+    # Never fork: by the time the pool starts the bot has an event loop and
+    # writer threads, and a forked child inherits their locks mid-use. A
+    # forkserver (or spawn) worker starts clean and imports the parsers by
+    # name, which is why they have to be module-level.
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+
+def _parse_body(parse: Callable[[str], T], body: bytes, charset: Optional[str]) -> T:
+    return parse(body.decode(charset or "utf-8", errors="replace"))
+
+
+class ParsePool:
+    def __init__(self, workers: int = DEFAULT_PARSE_WORKERS, inline_below: int = DEFAULT_INLINE_BELOW):
+        self._context = _pool_context()
+        # 0 parses inline on the calling thread
+        self.workers = workers
+        self.inline_below = inline_below
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        # Created on first use so importing the bot never starts workers
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=self._context)
+        return self._executor
+
+    async def parse(self, parse: Callable[[str], T], body: bytes, charset: Optional[str] = None) -> T:
+        if self.workers <= 0 or len(body) < self.inline_below:
+            return _parse_body(parse, body, charset)
+        METRICS.counter("parse_offloaded_total", "Pages parsed in the process pool", watcher=current_watcher.get()).inc()
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._pool(), _parse_body, parse, body, charset)
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM-killed); start a fresh pool next time
+            broken, self._executor = self._executor, None
+            if broken is not None:
+                broken.shutdown(wait=False)
+            METRICS.counter("parse_pool_broken_total", "Process pool restarts after a worker died").inc()
+            return _parse_body(parse, body, charset)
+
+    async def close(self) -> None:
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.to_thread(executor.shutdown, True, cancel_futures=True)
@@ -0,0 +1,213 @@
+import asyncio
+import re
+import time
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, Pattern, Sequence, Tuple
+
+from fetchEngine import RateLimitedError
+from htmlExtract import REDDIT_BASE_URL
+from keywordMatcher import KeywordMatcher
+from metrics import METRICS, current_watcher
+from redditSource import CursorStore, RedditListingSource, listing_url
+from scrapers import filter_hw_posts, filter_keyword_posts
+
+# One watcher for any number of subreddits. Each source brings its own rule
+# (keyword groups ANDed together, optionally applied only to the part of the
+# title a regex captures, e.g. [H]...[W]). Plain subreddits are folded into
+# multireddit listings (r/a+b+c/new.json), so a poll is one request per
+# MAX_SUBREDDITS_PER_LISTING subreddits. The `before` cursor keeps each
+# response down to the posts that are new, so cost follows new posts rather
+# than sources times page size. Batches shift when a subreddit is added or
+# removed, and a new batch URL starts without a cursor, so each subreddit also
+# keeps its own cursor and multireddit posts are filtered against it. Listings
+# are fetched concurrently; the fetch engine's per-host connection limit caps
+# how many hit reddit.com at once.
+
+# Reddit's largest page; with a cursor, a quiet poll returns nothing anyway
+DEFAULT_ENGINE_LIMIT = 100
+MAX_SUBREDDITS_PER_LISTING = 25
+
+_SUBREDDIT_URL = re.compile(r"^https?://(?:www\.|old\.)?reddit\.com/r/([A-Za-z0-9_]+)(?:/new)?/?(?:\.json)?$", re.IGNORECASE)
+
+
+class SourceRule(NamedTuple):
+    name: str
+    matcher: KeywordMatcher
+    pattern: Optional[Pattern]
+    mention: Optional[str]
+
+    def apply(self, posts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Copies, because the filters annotate posts and several rules may see the same one
+        posts = [dict(post, source=self.name) for post in posts]
+        if self.pattern is not None:
+            matched = filter_hw_posts(posts, self.matcher, self.pattern)
+        else:
+            matched = filter_keyword_posts(posts, self.matcher)
+        if self.mention is not None:
+            for post in matched:
+                post["mention"] = self.mention
+        return matched
+
+
+def _keyword_groups(raw: Any) -> List[List[str]]:
+    # A group is a list or a comma-separated string (so "${KEYWORDS}" works).
+    # Blank keywords (an unset variable, a trailing comma) are dropped: the
+    # matcher would treat "" as matching every title.
+    groups = []
+    for group in raw or []:
+        if isinstance(group, str):
+            group = group.split(",")
+        keywords = [keyword.strip() for keyword in group if keyword.strip()]
+        if keywords:
+            groups.append(keywords)
+    return groups
+
+
+def subreddit_name(url: str) -> Optional[str]:
+    # "buildapcsales" for a plain subreddit URL; None for anything fancier
+    match = _SUBREDDIT_URL.match(url.split("?", 1)[0])
+    return match.group(1).lower() if match else None
+
+
+def parse_source(spec: Mapping[str, Any]) -> Tuple[str, Optional[str], SourceRule]:
+    # -> (url, subreddit or None, rule)
+    if spec.get("subreddit"):
+        subreddit = str(spec["subreddit"]).lower()
+        url = f"{REDDIT_BASE_URL}/r/{subreddit}"
+    elif spec.get("url"):
+        url = spec["url"]
+        subreddit = subreddit_name(url)
+    else:
+        raise ValueError(f"Reddit source needs a subreddit or url: {dict(spec)!r}")
+    groups = _keyword_groups(spec.get("keywords"))
+    if not groups:
+        raise ValueError(f"Reddit source has no keywords: {dict(spec)!r}")
+    pattern = re.compile(spec["pattern"], re.IGNORECASE | re.DOTALL) if spec.get("pattern") else None
+    rule = SourceRule(
+        spec.get("name") or (f"r/{subreddit}" if subreddit else url),
+        KeywordMatcher(groups, names=[str(i) for i in range(len(groups))]),
+        pattern,
+        spec.get("mention"),
+    )
+    return url, subreddit, rule
+
+
+def _post_id(fullname: str) -> int:
+    # Fullnames are "t3_" plus a base-36 id that grows with every new post
+    return int(fullname.partition("_")[2], 36)
+
+
+class _Listing(NamedTuple):
+    source: RedditListingSource
+    # Rules by subreddit; None applies to every post (a standalone listing)
+    routes: Dict[Optional[str], List[SourceRule]]
+
+    def match(self, posts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if None in self.routes:
+            return [post for rule in self.routes[None] for post in rule.apply(posts)]
+        by_subreddit: Dict[str, List[Dict[str, Any]]] = {}
+        for post in posts:
+            by_subreddit.setdefault(post.get("subreddit", "").lower(), []).append(post)
+        matched = []
+        for subreddit, group in by_subreddit.items():
+            for rule in self.routes.get(subreddit, ()):
+                matched.extend(rule.apply(group))
+        return matched
+
+
+class RedditEngine:
+    def __init__(
+        self,
+        sources: Sequence[Mapping[str, Any]],
+        cursors: Optional[CursorStore] = None,
+        limit: int = DEFAULT_ENGINE_LIMIT,
+        headers: Optional[Mapping[str, str]] = None,
+        combine: bool = True,
+    ):
+        def listing(url: str, routes: Dict[Optional[str], List[SourceRule]]) -> _Listing:
+            return _Listing(RedditListingSource(url, cursors=cursors, limit=limit, headers=headers), routes)
+
+        combined: Dict[str, List[SourceRule]] = {}
+        standalone: Dict[str, List[SourceRule]] = {}
+        for spec in sources:
+            url, subreddit, rule = parse_source(spec)
+            if combine and subreddit is not None:
+                combined.setdefault(subreddit, []).append(rule)
+            else:
+                standalone.setdefault(url, []).append(rule)
+
+        self.listings: List[_Listing] = [listing(url, {None: rules}) for url, rules in standalone.items()]
+        names = sorted(combined)
+        for i in range(0, len(names), MAX_SUBREDDITS_PER_LISTING):
+            batch = names[i : i + MAX_SUBREDDITS_PER_LISTING]
+            url = f"{REDDIT_BASE_URL}/r/{'+'.join(batch)}"
+            self.listings.append(listing(url, {name: combined[name] for name in batch}))
+        # Listing URL -> monotonic time before which it is not polled (429s)
+        self._blocked_until: Dict[str, float] = {}
+        # Subreddit -> newest post seen, stored under the subreddit's own listing
+        # URL so a source that was polled on its own keeps its cursor
+        self._cursors = cursors
+        self._subreddit_cursors: Dict[str, str] = {}
+        if cursors is not None:
+            for name in combined:
+                fullname = cursors.get(self._cursor_key(name))
+                if fullname is not None:
+                    self._subreddit_cursors[name] = fullname
+
+    @staticmethod
+    def _cursor_key(subreddit: str) -> str:
+        return listing_url(f"{REDDIT_BASE_URL}/r/{subreddit}")
+
+    def _unseen(self, posts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Drop posts at or behind their subreddit's cursor, then advance the cursors
+        fresh = []
+        newest: Dict[str, str] = {}
+        for post in posts:
+            subreddit = post.get("subreddit", "").lower()
+            cursor = self._subreddit_cursors.get(subreddit)
+            if cursor is not None and _post_id(post["fullname"]) <= _post_id(cursor):
+                continue
+            fresh.append(post)
+            if subreddit not in newest or _post_id(post["fullname"]) > _post_id(newest[subreddit]):
+                newest[subreddit] = post["fullname"]
+        for subreddit, fullname in newest.items():
+            self._subreddit_cursors[subreddit] = fullname
+            if self._cursors is not None:
+                self._cursors.set(self._cursor_key(subreddit), fullname)
+        return fresh
+
+    async def fetch_new(self, fetcher) -> List[Dict[str, Any]]:
+        # New posts from every listing that matched their source's rule
+        now = time.monotonic()
+        due = [l for l in self.listings if self._blocked_until.get(l.source.url, 0.0) <= now]
+        if not due:
+            return []
+        results = await asyncio.gather(*(l.source.fetch_new(fetcher) for l in due), return_exceptions=True)
+
+        matched: List[Dict[str, Any]] = []
+        seen = set()
+        failures: List[BaseException] = []
+        for listing, result in zip(due, results):
+            if isinstance(result, asyncio.CancelledError):
+                raise result
+            if isinstance(result, BaseException):
+                failures.append(result)
+                if isinstance(result, RateLimitedError):
+                    # Back off this listing only; the others keep their schedule
+                    self._blocked_until[listing.source.url] = now + result.retry_after
+                METRICS.counter(
+                    "reddit_listing_errors_total", "Listing fetches that failed", watcher=current_watcher.get(), kind=type(result).__name__
+                ).inc()
+                print(f"Reddit listing {listing.source.url} failed: {result}")
+                continue
+            if None not in listing.routes:
+                result = self._unseen(result)
+            for post in listing.match(result):
+                # Two rules matching one post still make one alert
+                if post["link"] not in seen:
+                    seen.add(post["link"])
+                    matched.append(post)
+
+        if failures and len(failures) == len(due):
+            # Nothing got through: let the scheduler count it and back off
+            raise max(failures, key=lambda e: getattr(e, "retry_after", 0.0))
+        return matched
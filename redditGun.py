@@ -1,17 +1,26 @@
 import os
-import re
-import subprocess
-import time
-import requests
 import asyncio
 import discord
 import json
 
-from bs4 import BeautifulSoup
-from discord.ext import commands, tasks
+from pathlib import Path
+from discord.ext import commands
 from dotenv import load_dotenv
 from icecream import ic
 
+from alertCache import open_alert_cache
+from fetchEngine import FetchEngine
+from htmlExtract import ButtonTextParser
+from loopWatchdog import DEFAULT_THRESHOLD, LoopWatchdog
+from messageChunker import iter_chunks
+from metrics import start_metrics_server, summary_lines
+from notifier import Notifier
+from parsePool import DEFAULT_PARSE_WORKERS, ParsePool
+from redditEngine import DEFAULT_ENGINE_LIMIT, RedditEngine
+from redditSource import CursorStore
+from watchers import WatcherScheduler, config_path, extractor, load_watchers
+import scrapers
+
 load_dotenv()
 
 config = {
@@ -28,7 +37,13 @@ config = {
     "URL_5": os.getenv('URL_5'),
     "IP": os.getenv('IP'),
     "URL_6": os.getenv('URL_6'),
-    "URL_4": os.getenv('URL_4')
+    "URL_4": os.getenv('URL_4'),
+    # Optional: serve Prometheus metrics on 127.0.0.1:<port>/metrics
+    "METRICS_PORT": os.getenv('METRICS_PORT'),
+    # Seconds the event loop may stay blocked before its stack is logged
+    "LOOP_LAG_THRESHOLD": float(os.getenv('LOOP_LAG_THRESHOLD') or DEFAULT_THRESHOLD),
+    # Processes for HTML parsing; 0 parses on the event loop thread
+    "PARSE_WORKERS": int(os.getenv('PARSE_WORKERS') or DEFAULT_PARSE_WORKERS),
 }
 
 # ic(config)
@@ -40,230 +55,105 @@ headers = {
     "Connection": "keep-alive"
 }
 
-CACHE = []
-CACHE_EXPIRY = 120 * 60  # 15 minutes in seconds
-FISH_CURR_PRICE = 199.99
-CURR_IP = config['IP']
-
-def scrape_reddit():
-    url = config['URL']
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, 'html.parser')
-
-    title_elements = soup.find_all('a', class_='block text-neutral-content-strong m-0 visited:text-neutral-content-weak font-semibold text-16-scalable xs:text-18-scalable mb-2xs xs:mb-xs overflow-hidden')
-
-    keywords = config['KEYWORDS']
-    otherKeywords = config['OTHER_KEYWORDS']
-
-    titles = []
-    base_url = "https://www.reddit.com"
-    for title_element in title_elements:
-        if title_element.has_attr('slot') and title_element['slot'] == 'title':
-            title = title_element.text
-            if any(keyword.lower() in title.lower() for keyword in keywords):
-                if any(otherKeyword.lower() in title.lower() for otherKeyword in otherKeywords):
-                    href = title_element.get('href')
-                    if not href.startswith(base_url):
-                        href = base_url + href
-                    titles.append({'title': title, 'link': href})
-    return titles
-
-def scrape_reddit2():
-    url = config['URL_3']
-    response = requests.get(url)
-
-    soup = BeautifulSoup(response.text, 'html.parser')
-
-    # Find all title elements
-    title_elements = soup.find_all('a', class_='block text-neutral-content-strong m-0 visited:text-neutral-content-weak font-semibold text-14 xs:text-16 mb-xs overflow-hidden')
-    newOtherKeywords = config['NEW_OTHER_KEYWORDS']
-
-    titles = []
-    base_url = "https://www.reddit.com"
-    for title_element in title_elements:
-        #grab the title text and shorten it from [H] to [W]
-        if title_element.has_attr('slot') and title_element['slot'] == 'title':
-            title = title_element.text
-            match = re.search(r'\[H\](.*?)\[W\]', title, re.IGNORECASE | re.DOTALL)
-            if match:
-                between_hw = match.group(1).strip()
-                if any(otherKeyword.lower() in between_hw.lower() for otherKeyword in newOtherKeywords):
-                    href = title_element.get('href')
-                    if not href.startswith(base_url):
-                        href = base_url + href
-                    titles.append({'title': title, 'link': href})
-
-    return titles
-
-def is_post_alerted(post):
-    current_time = time.time()
-
-    # Filter out expired posts
-    global CACHE
-    CACHE = [(timestamp, cached_post) for timestamp, cached_post in CACHE if current_time - timestamp < CACHE_EXPIRY]
-    
-    # Check if the post is in the filtered CACHE
-    for timestamp, cached_post in CACHE:
-        if cached_post['link'] == post['link']:
-            return True
-    return False
-
-def add_post_to_cache(post):
-    CACHE.append((time.time(), post))
+CACHE_EXPIRY = 120 * 60  # 120 minutes in seconds
+CACHE_MAX_ENTRIES = 10_000
+
+# One pooled aiohttp session shared by every watcher; large pages are parsed
+# in worker processes when PARSE_WORKERS is set
+fetcher = FetchEngine(parse_pool=ParsePool(workers=config['PARSE_WORKERS']))
+
+# Alerted post links, persisted in alerts.db so restarts don't re-ping
+CACHE = open_alert_cache(CACHE_EXPIRY, db_path=Path('alerts.db'), max_entries=CACHE_MAX_ENTRIES)
+# Newest-seen fullname per Reddit JSON listing, so restarts resume incrementally
+CURSORS = CursorStore(Path('alerts.db'))
+
+def reddit_engine(ctx, sources=None):
+    # One engine per watcher; its listings' cursors live in alerts.db
+    engine = ctx.state.get('engine')
+    if engine is None:
+        engine = RedditEngine(
+            sources if sources is not None else ctx.watcher.options['sources'],
+            cursors=CURSORS,
+            limit=int(ctx.watcher.options.get('limit', DEFAULT_ENGINE_LIMIT)),
+            headers={'User-Agent': ctx.watcher.options.get('user_agent', headers['User-Agent'])},
+            combine=bool(ctx.watcher.options.get('combine', True)),
+        )
+        ctx.state['engine'] = engine
+    return engine
+
+@extractor('reddit')
+async def scrape_subreddits(ctx):
+    # Every source in the watcher's "sources" list, each with its own rule
+    return await reddit_engine(ctx).fetch_new(ctx.fetcher)
+
+# Single-subreddit extractors kept for existing watchers.json files; both are
+# one-source engines using the keyword lists from .env
+@extractor('reddit_keywords')
+@extractor('reddit_json_keywords')
+async def scrape_reddit(ctx):
+    source = {'url': ctx.watcher.url, 'keywords': [config['KEYWORDS'], config['OTHER_KEYWORDS']]}
+    return await reddit_engine(ctx, [source]).fetch_new(ctx.fetcher)
+
+@extractor('reddit_hw')
+@extractor('reddit_json_hw')
+async def scrape_reddit2(ctx):
+    source = {'url': ctx.watcher.url, 'pattern': scrapers.HW_PATTERN.pattern, 'keywords': [config['NEW_OTHER_KEYWORDS']]}
+    return await reddit_engine(ctx, [source]).fetch_new(ctx.fetcher)
 
 # Custom scraper for the fish store
-def scrape_fish():
-    url = config['URL_2']
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, 'html.parser')
-
-    # Find the price
-    price_span = soup.find('span', class_='price-item price-item--regular')
-
-    if price_span:
-        price_text = price_span.text.strip()
-        if price_text:
-            global FISH_CURR_PRICE
-            price = float(price_text[1:])
-            if FISH_CURR_PRICE != price:
-                FISH_CURR_PRICE = price
-                return True
-
-    return False
-
-def scrape_patch():
-    url = config['URL_5']
-    file_name = 'patch.html'
-
-    curl_command = [
-        'curl', '-o', file_name, url
-    ]
-
-    subprocess.run(curl_command)
-
-    # Read the HTML file with BeautifulSoup
-    with open(file_name, 'r') as file:
-        soup = BeautifulSoup(file, 'html.parser')
-
-    os.remove(file_name)
-
-    button = soup.find('button', id='ProductSubmitButton-template--23839774408987__main')
-
-    if button:
-        span = button.find('span')
-        if span:
-            span_text = span.text.strip()
-            return span_text != "Sold out"
+@extractor('fish_price')
+async def scrape_fish(ctx):
+    return await ctx.fetcher.fetch_parsed(ctx.watcher.url, scrapers.parse_fish_price)
 
-    return False
-
-def scrape_pid():
-    url = config['URL_4']
-
-    response = requests.get(url)
-    soup = BeautifulSoup(response.text, 'html.parser')
-
-    product_info = soup.find_all('div', class_='col-xs-12 padding-v-10')[1]
-    # ic(product_info.text)
-    if product_info and 'In Stock' in product_info.text:
-        return True
-
-    return False
-
-def scrape_ip():
-    global CURR_IP
+@extractor('patch_stock')
+async def scrape_patch(ctx):
+    # Stream the page and stop as soon as the add-to-cart button's label is known
+    parser = ButtonTextParser('ProductSubmitButton-')
+    await ctx.fetcher.stream(ctx.watcher.url, parser.feed_chunk)
 
-    response = requests.get('https://api.ipify.org?format=json')
-    if response.status_code == 200:
-        if response.json()['ip'] != CURR_IP:
-            CURR_IP = response.json()['ip']
-            return True
+    if parser.span_text is not None:
+        return parser.span_text.strip() != "Sold out"
 
     return False
 
-def scrape_toothless_lunchbag():
-    url = config['URL_6']
-    response = requests.get(url, headers=headers, timeout=10)
-    soup = BeautifulSoup(response.text, 'html.parser')
+@extractor('pid_stock')
+async def scrape_pid(ctx):
+    return await ctx.fetcher.fetch_parsed(ctx.watcher.url, scrapers.parse_pid)
 
-    div = soup.find('div', class_='prices d-flex')
-
-    in_stock_marker = div.find('span', class_=lambda c: c and 'priceModal' in c)
-    if in_stock_marker:
-        return True
-
-    return False
+@extractor('toothless_stock')
+async def scrape_toothless_lunchbag(ctx):
+    return await ctx.fetcher.fetch_parsed(ctx.watcher.url, scrapers.parse_toothless_lunchbag, headers=headers, timeout=10)
 
 class AutoBots(commands.Bot):
-    @tasks.loop(seconds=20)
-    async def reddit_watcher(channel):
-        posts = scrape_reddit()
-        if posts:
-            for post_data in posts:
-                if not is_post_alerted(post_data):
-                    user_id = config['USER_ID']
-                    message = f"{user_id} \nTitle: {post_data['title']} \nLink: {post_data['link']}"
-                    await channel.send(message)
-                    add_post_to_cache(post_data)
-                else:
-                    print('Post already alerted.')
-            print('Reddit Message Sent.')
-        
-    @tasks.loop(seconds=20)
-    async def reddit_watcher2(channel):
-        posts = scrape_reddit2()
-        if posts:
-            for post_data in posts:
-                if not is_post_alerted(post_data):
-                    user_id = config['USER_ID']
-                    message = f"{user_id} \nTitle: {post_data['title']} \nLink: {post_data['link']}"
-                    await channel.send(message)
-                    add_post_to_cache(post_data)
-                else:
-                    print('Post already alerted.')
-            print('Second Reddit Message Sent.')
-
-    @tasks.loop(seconds=21600)
-    async def fish_watcher(channel):
-        if scrape_fish():
-            user_id = config['USER_ID_2']
-            message = f"{user_id} \nPrice: {FISH_CURR_PRICE} \nLink: {config['URL_2']}"
-            await channel.send(message)
-            print('Fish Message Sent.')
-
-    @tasks.loop(seconds=86400)
-    async def patch_watcher(channel):
-        if scrape_patch():
-            user_id = config['USER_ID']
-            message = f"{user_id} \nPatch in stock! \nLink: {config['URL_5']}"
-            await channel.send(message)
-            print('Patch Message Sent.')
-
-    @tasks.loop(seconds=3600)
-    async def pid_watcher(channel):
-        if scrape_pid():
-            user_id = config['USER_ID']
-            message = f"{user_id} \nPID Available \nLink: {config['URL_4']}"
-            await channel.send(message)
-            print('PID Message Sent.')
-
-    @tasks.loop(seconds=86400)
-    async def ip_watcher(channel):
-        if scrape_ip():
-            user_id = config['USER_ID']
-            message = f"{user_id} \nNew IP: {CURR_IP}"
-            await channel.send(message)
-            print('IP Update Message Sent.')
-
-    @tasks.loop(seconds=86400)
-    async def toothless_lunchbag_watcher(channel):
-        if scrape_toothless_lunchbag():
-            user_id = config['USER_ID_2']
-            message = f"{user_id} \nToothless Lunch Bag in stock! \nLink: {config['URL_6']}"
-            await channel.send(message)
-            print('Toothless Lunch Bag Message Sent.')
-
-bot = commands.Bot(command_prefix='/', intents=discord.Intents.all())
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Alerts are queued and batched so scraping never waits on Discord I/O
+        self.notifier = Notifier(self)
+        # Watchers come from watchers.json; adding one needs no code change
+        self.scheduler = WatcherScheduler(
+            self,
+            load_watchers(config_path()),
+            fetcher,
+            dedup=CACHE,
+            notifier=self.notifier,
+            default_channel_id=config['CHANNEL_ID'],
+        )
+        self.metrics_runner = None
+        # Logs the stack of anything that blocks the loop past the threshold
+        self.watchdog = LoopWatchdog(threshold=config['LOOP_LAG_THRESHOLD'])
+
+    async def close(self):
+        await self.watchdog.stop()
+        await self.scheduler.stop()
+        await self.notifier.stop()
+        if self.metrics_runner is not None:
+            await self.metrics_runner.cleanup()
+        await fetcher.close()
+        CACHE.close()
+        CURSORS.close()
+        await super().close()
+
+bot = AutoBots(command_prefix='/', intents=discord.Intents.all())
 bot.remove_command('help')
 
 # Optional: attach JournalCog if available
@@ -291,7 +181,6 @@ except Exception as e:
 
 @bot.event
 async def on_ready():
-        channel = bot.get_channel(config['CHANNEL_ID'])
         # Load JournalCog and sync commands (run once)
         try:
             if journal_features["enabled"] and journal_features["cog_cls"] is not None and not getattr(bot, "_journal_loaded", False):
@@ -301,15 +190,15 @@ async def on_ready():
                 bot._journal_loaded = True
         except Exception as e:
             print(f"Failed to add/sync JournalCog: {e}")
-        await asyncio.gather(
-            # AutoBots.reddit_watcher.start(channel),
-            # AutoBots.reddit_watcher2.start(channel),
-            # AutoBots.fish_watcher.start(channel),
-            # AutoBots.patch_watcher.start(channel),
-            AutoBots.pid_watcher.start(channel),
-            AutoBots.ip_watcher.start(channel),
-            AutoBots.toothless_lunchbag_watcher.start(channel)
-        )
+        if config['METRICS_PORT'] and bot.metrics_runner is None:
+            try:
+                bot.metrics_runner = await start_metrics_server(int(config['METRICS_PORT']))
+            except Exception as e:
+                print(f"Metrics endpoint not started: {e}")
+        # on_ready fires again after reconnects; these only start once
+        bot.watchdog.start()
+        bot.notifier.start()
+        bot.scheduler.start()
 
 @bot.hybrid_command(name='utils')
 async def utils(ctx: commands.Context, ebill: str):
@@ -327,11 +216,18 @@ async def utils(ctx: commands.Context, ebill: str):
 
 @bot.hybrid_command(name='ip')
 async def ip(ctx: commands.Context):
-    response = requests.get('https://api.ipify.org?format=json')
-    if response.status_code == 200:
+    response = await fetcher.fetch('https://api.ipify.org?format=json')
+    if response.status == 200:
         ip_data = response.json()
         await ctx.send(f"Current IP: {ip_data['ip']}")
     else:
         await ctx.send('Failed to retrieve IP address.')
 
-bot.run(config['TOKEN'])
+@bot.hybrid_command(name='stats')
+async def stats(ctx: commands.Context):
+    # Per-watcher, journal and Discord send metrics since startup
+    for chunk in iter_chunks(summary_lines(), limit=1990, separator='\n'):
+        await ctx.send(f"```{chunk}```")
+
+if __name__ == '__main__':
+    bot.run(config['TOKEN'])
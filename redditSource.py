@@ -0,0 +1,138 @@
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Mapping, Optional
+
+from alertCache import SQLiteWriter
+from htmlExtract import REDDIT_BASE_URL, absolute_reddit_link
+
+# Incremental Reddit listing reader. Instead of the rendered subreddit HTML it
+# reads /new.json and only asks for posts newer than the last one it has seen
+# (the `before` cursor), so a quiet subreddit costs a near-empty JSON payload.
+
+DEFAULT_LIMIT = 25
+# After this many empty polls, re-check that the cursor post is still listed
+# (a deleted/removed cursor post makes `before` return nothing forever)
+DEFAULT_VERIFY_EVERY = 10
+
+
+class CursorStore:
+    # Cursors are read once at startup; updates come from the event loop, so
+    # they're kept in memory and committed on a writer thread
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS listing_cursor (
+                    source TEXT PRIMARY KEY,
+                    fullname TEXT NOT NULL
+                )
+                """
+            )
+            conn.commit()
+            self._cursors: Dict[str, str] = dict(conn.execute("SELECT source, fullname FROM listing_cursor"))
+        finally:
+            conn.close()
+        self._writer = SQLiteWriter(self.db_path, name="cursor-writer")
+
+    def get(self, source: str) -> Optional[str]:
+        return self._cursors.get(source)
+
+    def set(self, source: str, fullname: str) -> None:
+        self._cursors[source] = fullname
+        self._writer.submit(
+            "INSERT OR REPLACE INTO listing_cursor (source, fullname) VALUES (?, ?)",
+            [(source, fullname)],
+        )
+
+    def flush(self) -> None:
+        self._writer.flush()
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+def listing_url(url: str) -> str:
+    # Accept either a subreddit URL or an explicit .json listing
+    url = url.split("?", 1)[0].rstrip("/")
+    if url.endswith(".json"):
+        return url
+    if not url.endswith("/new"):
+        url += "/new"
+    return url + ".json"
+
+
+def posts_from_listing(payload: Mapping, base_url: str = REDDIT_BASE_URL) -> List[Dict[str, str]]:
+    posts = []
+    for child in payload.get("data", {}).get("children", []):
+        data = child.get("data", {})
+        if not data.get("name") or not data.get("permalink"):
+            continue
+        posts.append({
+            "title": data.get("title", ""),
+            "link": absolute_reddit_link(data["permalink"], base_url),
+            "fullname": data["name"],
+            "subreddit": data.get("subreddit", ""),
+        })
+    return posts
+
+
+class RedditListingSource:
+    def __init__(
+        self,
+        url: str,
+        cursors: Optional[CursorStore] = None,
+        limit: int = DEFAULT_LIMIT,
+        headers: Optional[Mapping[str, str]] = None,
+        verify_every: int = DEFAULT_VERIFY_EVERY,
+    ):
+        self.url = listing_url(url)
+        self.cursors = cursors
+        self.limit = limit
+        self.headers = dict(headers or {})
+        self.verify_every = verify_every
+        self.cursor: Optional[str] = cursors.get(self.url) if cursors is not None else None
+        self._empty_polls = 0
+
+    def _params(self, before: Optional[str]) -> str:
+        query = f"?limit={self.limit}&raw_json=1"
+        if before:
+            query += f"&before={before}"
+        return self.url + query
+
+    def _advance(self, fullname: str) -> None:
+        self.cursor = fullname
+        if self.cursors is not None:
+            self.cursors.set(self.url, fullname)
+
+    async def fetch_new(self, fetcher) -> List[Dict[str, str]]:
+        # Posts newer than the cursor, newest first
+        response = await fetcher.fetch(self._params(self.cursor), headers=self.headers)
+        if response.status != 200:
+            return []
+        posts = posts_from_listing(response.json())
+        if posts:
+            self._empty_polls = 0
+            self._advance(posts[0]["fullname"])
+            return posts
+
+        self._empty_polls += 1
+        if self.cursor and self._empty_polls >= self.verify_every:
+            self._empty_polls = 0
+            return await self._verify_cursor(fetcher)
+        return []
+
+    async def _verify_cursor(self, fetcher) -> List[Dict[str, str]]:
+        response = await fetcher.fetch(self._params(None), headers=self.headers)
+        if response.status != 200:
+            return []
+        latest = posts_from_listing(response.json())
+        if latest and all(post["fullname"] != self.cursor for post in latest):
+            # Cursor post vanished from the listing; resume from the newest post and
+            # hand back the current page (the dedup store drops anything already sent)
+            self._advance(latest[0]["fullname"])
+            return latest
+        return []
@@ -0,0 +1,80 @@
+import re
+
+from bs4 import BeautifulSoup
+
+from htmlExtract import extract_reddit_titles
+from keywordMatcher import describe_hits
+
+# Page parsers for the watchers, kept free of bot/config state so they can be
+# run offline (see benchmarks/bench_suite.py). Keyword matchers are passed in.
+
+HW_PATTERN = re.compile(r'\[H\](.*?)\[W\]', re.IGNORECASE | re.DOTALL)
+
+
+def filter_keyword_posts(posts, matcher):
+    titles = []
+    for post in posts:
+        hits = matcher.match(post['title'])
+        if hits:
+            post['matched'] = describe_hits(hits)
+            titles.append(post)
+    return titles
+
+
+def filter_hw_posts(posts, matcher, pattern=HW_PATTERN):
+    titles = []
+    for post in posts:
+        #grab the title text and shorten it from [H] to [W]
+        match = pattern.search(post['title'])
+        if match:
+            hits = matcher.match(match.group(1).strip())
+            if hits:
+                post['matched'] = describe_hits(hits)
+                titles.append(post)
+
+    return titles
+
+
+def parse_reddit(html, matcher):
+    return filter_keyword_posts(extract_reddit_titles(html), matcher)
+
+
+def parse_reddit2(html, matcher):
+    return filter_hw_posts(extract_reddit_titles(html), matcher)
+
+
+def parse_fish_price(html):
+    soup = BeautifulSoup(html, 'html.parser')
+
+    # Find the price
+    price_span = soup.find('span', class_='price-item price-item--regular')
+
+    if price_span:
+        price_text = price_span.text.strip()
+        if price_text:
+            return float(price_text[1:])
+
+    return None
+
+
+def parse_pid(html):
+    soup = BeautifulSoup(html, 'html.parser')
+
+    product_info = soup.find_all('div', class_='col-xs-12 padding-v-10')[1]
+    # ic(product_info.text)
+    if product_info and 'In Stock' in product_info.text:
+        return True
+
+    return False
+
+
+def parse_toothless_lunchbag(html):
+    soup = BeautifulSoup(html, 'html.parser')
+
+    div = soup.find('div', class_='prices d-flex')
+
+    in_stock_marker = div.find('span', class_=lambda c: c and 'priceModal' in c)
+    if in_stock_marker:
+        return True
+
+    return False
@@ -0,0 +1,29 @@
+from alertCache import open_alert_cache
+
+
+def test_writes_are_batched_and_survive_restart(tmp_path):
+    db = tmp_path / "alerts.db"
+    cache = open_alert_cache(60, db_path=db)
+    for i in range(500):
+        cache.add(f"link{i}")
+    # A discard queued after its add must win
+    cache.discard("link3")
+    cache.close()
+
+    reopened = open_alert_cache(60, db_path=db)
+    try:
+        assert len(reopened) == 499
+        assert "link3" not in reopened
+        assert "link4" in reopened
+    finally:
+        reopened.close()
+
+
+def test_flush_commits_pending_writes(tmp_path):
+    db = tmp_path / "alerts.db"
+    cache = open_alert_cache(60, db_path=db)
+    cache.add("a")
+    cache.backend.flush()
+    rows = cache.backend._conn.execute("SELECT link FROM alerted").fetchall()
+    cache.close()
+    assert rows == [("a",)]
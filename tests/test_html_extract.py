@@ -0,0 +1,72 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from fetchEngine import FetchEngine
+from htmlExtract import ButtonTextParser
+
+PAGE = (
+    '<html><body><div class="product">'
+    '<button type="button" id="Wishlist-1"><span>Save</span></button>'
+    '<button type="submit" id="ProductSubmitButton-template--1" class="product-form__submit">'
+    '<span>\n  Add to cart – €9\n</span><div class="loading hidden"></div></button>'
+    '</div>' + '<p>footer</p>' * 2000 + '</body></html>'
+)
+
+
+def _feed(chunks):
+    parser = ButtonTextParser("ProductSubmitButton-")
+    for chunk in chunks:
+        if parser.feed_chunk(chunk):
+            break
+    return parser
+
+
+@pytest.mark.parametrize("split", range(0, PAGE.index("</span><div"), 7))
+def test_button_found_across_any_chunk_boundary(split):
+    parser = _feed([PAGE[:split], PAGE[split:]])
+    assert parser.done
+    assert parser.span_text.strip() == "Add to cart – €9"
+
+
+def test_stops_at_the_button_and_ignores_the_rest():
+    parser = ButtonTextParser("ProductSubmitButton-")
+    end = PAGE.index("</button>", PAGE.index("ProductSubmitButton-"))
+    assert parser.feed_chunk(PAGE[:end])
+    # Later chunks (even another matching button) are not parsed
+    assert parser.feed_chunk('<button id="ProductSubmitButton-2"><span>Sold out</span></button>')
+    assert parser.span_text.strip() == "Add to cart – €9"
+
+
+def test_page_without_the_button_is_never_done():
+    parser = _feed([PAGE.replace("ProductSubmitButton-", "Other-")])
+    assert not parser.done and not parser.found_button and parser.span_text is None
+
+
+def test_stream_stops_downloading_once_the_label_is_known():
+    body = PAGE.encode()
+
+    async def handle(request):
+        return web.Response(body=body, content_type="text/html", charset="utf-8")
+
+    async def main():
+        app = web.Application()
+        app.router.add_get("/product", handle)
+        server = TestServer(app)
+        await server.start_server()
+        fetcher = FetchEngine()
+        parser = ButtonTextParser("ProductSubmitButton-")
+        try:
+            # 5-byte chunks split tags, attributes and the multi-byte characters
+            result = await fetcher.stream(str(server.make_url("/product")), parser.feed_chunk, chunk_size=5)
+        finally:
+            await fetcher.close()
+            await server.close()
+        return parser, result
+
+    parser, result = asyncio.run(main())
+    assert parser.span_text.strip() == "Add to cart – €9"
+    assert not result.complete
+    assert result.bytes_read < len(body) // 2
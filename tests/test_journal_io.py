@@ -0,0 +1,25 @@
+import pytest
+
+from journalLog import JournalStore, export_entries, import_entries
+
+ROWS = [
+    ("u1", "2025-01-05T09:00:00+01:00", 1736064000, "CET", "plain entry"),
+    ("u1", "2025-01-05T10:00:00+00:00", 1736071200, None, "NULL timezone"),
+    ("u2", "2025-01-05T11:00:00+00:00", 1736074800, "", "empty timezone"),
+    ("u2", "sometime last spring", None, None, 'unparsed, with "quotes"\nand a newline'),
+    ("\\N", "2025-01-05T12:00:00+00:00", 1736078400, "UTC", "\\N"),
+]
+
+
+@pytest.mark.parametrize("fmt", ["csv", "jsonl"])
+def test_export_import_round_trip_is_lossless(tmp_path, fmt):
+    source = tmp_path / "source.db"
+    with JournalStore(source) as store:
+        store.insert_rows(ROWS)
+    dump = tmp_path / f"dump.{fmt}"
+    assert export_entries(source, str(dump), fmt) == len(ROWS)
+
+    target = tmp_path / "target.db"
+    assert import_entries(target, str(dump), fmt) == len(ROWS)
+    with JournalStore(target) as store:
+        assert list(store.iter_rows()) == ROWS
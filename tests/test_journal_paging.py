@@ -0,0 +1,64 @@
+import pytest
+
+from journalLog import JournalStore, _page_key
+
+ADMIN = "admin"
+PAGE = 3
+
+
+@pytest.fixture
+def store(tmp_path):
+    with JournalStore(tmp_path / "journal.db") as store:
+        rows = []
+        for i in range(20):
+            # Every third row is a legacy entry whose created_at never parsed
+            epoch = None if i % 3 == 0 else 1736067600 + (i % 7) * 60
+            rows.append((f"u{i % 2}", f"legacy {i}" if epoch is None else "2025-01-05T09:00:00+00:00", epoch, "UTC", f"entry {i}"))
+        store.insert_rows(rows)
+        yield store
+
+
+def _expected(store, user=None):
+    rows = store.get_entries(ADMIN, ADMIN, user)
+    # Dated rows newest first, then undated rows by id, newest first
+    assert [r[2] is None for r in rows] == sorted(r[2] is None for r in rows)
+    return [r[0] for r in rows]
+
+
+def _walk(store, user=None):
+    query = (ADMIN, ADMIN, user, None, None)
+    pages = []
+    rows, more = store.get_page(*query, limit=PAGE)
+    pages.append([r[0] for r in rows])
+    while more:
+        rows, more = store.get_page(*query, limit=PAGE, before=_page_key(rows[-1]))
+        pages.append([r[0] for r in rows])
+    older = [i for page in pages for i in page]
+
+    # And back up with Newer from the last page
+    newer_pages = [pages[-1]]
+    edge = _page_key(rows[0])
+    while True:
+        rows, more = store.get_page(*query, limit=PAGE, after=edge)
+        newer_pages.append([r[0] for r in rows])
+        if not more:
+            break
+        edge = _page_key(rows[0])
+    return older, pages, newer_pages
+
+
+@pytest.mark.parametrize("user", [None, "u0"])
+def test_paging_covers_rows_with_null_epoch(store, user):
+    expected = _expected(store, user)
+    older, pages, newer_pages = _walk(store, user)
+    assert older == expected
+    assert all(len(page) == PAGE for page in pages[:-1])
+    # Walking back up visits the same pages in reverse
+    assert newer_pages == pages[::-1][: len(newer_pages)]
+    assert newer_pages[-1] == pages[0]
+
+
+def test_date_filters_leave_out_undated_rows(store):
+    rows, more = store.get_page(ADMIN, ADMIN, None, None, 36500, limit=100)
+    assert rows and not more
+    assert all(r[2] is not None for r in rows)
@@ -0,0 +1,69 @@
+import pytest
+
+from journalLog import JournalStore, _build_count_query, _build_entries_query
+
+ADMIN = "admin"
+
+# (requester, target, date, days_ago) like the journal_get option combinations
+CASES = [
+    ("u1", None, None, None),
+    ("u1", None, "2025-01-05", None),
+    ("u1", None, None, 7),
+    (ADMIN, None, None, None),
+    (ADMIN, "u2", None, None),
+    (ADMIN, "u2", "2025-01-05", None),
+    (ADMIN, None, "2025-01-05", None),
+    (ADMIN, None, None, 7),
+    (ADMIN, "u2", None, 7),
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    with JournalStore(tmp_path / "journal.db") as store:
+        rows = [
+            (f"u{i % 5}", "2025-01-05T09:00:00+00:00", 1736067600 + i * 60, "UTC", f"entry {i}")
+            for i in range(500)
+        ]
+        store.insert_rows(rows)
+        yield store
+
+
+def _plan(store, sql, params):
+    return [row[-1] for row in store._conn.execute("EXPLAIN QUERY PLAN " + sql, params)]
+
+
+def _assert_uses_epoch_index(plan):
+    journal_steps = [step for step in plan if "journal" in step]
+    assert journal_steps, plan
+    for step in journal_steps:
+        assert "USING INDEX idx_journal_" in step or "USING COVERING INDEX idx_journal_" in step, plan
+    assert not any("TEMP B-TREE" in step for step in plan), plan
+
+
+# get_page never reads undated rows under a date filter
+ENTRY_CASES = [
+    (*case, page, segment)
+    for case in CASES
+    for page in (None, "before", "after")
+    for segment in (None, "dated", "undated")
+    if not (segment == "undated" and (case[2] or case[3] is not None))
+]
+
+
+@pytest.mark.parametrize("requester,target,date_str,days_ago,page,segment", ENTRY_CASES)
+def test_entries_query_walks_the_epoch_index(store, requester, target, date_str, days_ago, page, segment):
+    edge = (None, 250) if segment == "undated" else (1736067600 + 250 * 60, 250)
+    sql, params = _build_entries_query(
+        requester, ADMIN, target, date_str, days_ago, limit=11,
+        before=edge if page == "before" else None,
+        after=edge if page == "after" else None,
+        segment=segment,
+    )
+    _assert_uses_epoch_index(_plan(store, sql, params))
+
+
+@pytest.mark.parametrize("requester,target,date_str,days_ago", CASES)
+def test_count_query_uses_the_epoch_index(store, requester, target, date_str, days_ago):
+    sql, params = _build_count_query(requester, ADMIN, target, date_str, days_ago)
+    _assert_uses_epoch_index(_plan(store, sql, params))
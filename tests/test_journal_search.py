@@ -0,0 +1,59 @@
+import pytest
+
+import journalLog
+from journalLog import JournalStore
+
+ADMIN = "admin"
+ENTRIES = [
+    ("u1", "Went running by the river, then fish and chips"),
+    ("u2", "Read a book about rust; 100% worth it"),
+    ("u1", "Rusty bike chain, went running anyway"),
+    ("u1", "Nothing much today"),
+]
+
+
+def _fill(store):
+    store.insert_rows([
+        (user, "2025-01-05T09:00:00+00:00", 1736067600 + i, "UTC", content)
+        for i, (user, content) in enumerate(ENTRIES)
+    ])
+
+
+@pytest.fixture
+def store(tmp_path):
+    with JournalStore(tmp_path / "journal.db") as store:
+        _fill(store)
+        yield store
+
+
+def _ids(rows):
+    return sorted(row[0] for row in rows)
+
+
+@pytest.mark.parametrize("text", ["running", "run*", "rust*", "went running", "100%", "river chips", "nothing here"])
+def test_like_fallback_finds_what_fts_finds(store, text):
+    with_fts = store.search(text, ADMIN, ADMIN)
+    store.has_fts = False
+    fallback = store.search(text, ADMIN, ADMIN)
+    assert _ids(fallback) == _ids(with_fts)
+    for row in fallback:
+        assert "**" in row[4]
+
+
+def test_like_fallback_keeps_access_control(store):
+    store.has_fts = False
+    assert {row[1] for row in store.search("running", "u2", ADMIN)} == set()
+    assert {row[1] for row in store.search("rust", "u2", ADMIN)} == {"u2"}
+
+
+def test_search_without_fts5(tmp_path, monkeypatch, capsys):
+    # What a build without FTS5 looks like: the virtual table can't be created
+    def no_fts(conn):
+        return False
+
+    monkeypatch.setattr(journalLog, "_ensure_fts", no_fts)
+    with JournalStore(tmp_path / "journal.db") as store:
+        assert not store.has_fts
+        _fill(store)
+        assert len(store.search("running", ADMIN, ADMIN)) == 2
+    assert "LIKE" in capsys.readouterr().err
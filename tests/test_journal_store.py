@@ -0,0 +1,127 @@
+import asyncio
+import sqlite3
+import threading
+
+import pytest
+
+import journalLog
+from journalLog import SCHEMA_VERSION, AsyncJournalStore, JournalStore
+
+
+def _old_database(path, rows):
+    # A journal.db as the bot created it before schema versioning: no epoch
+    # column, no indexes, user_version 0
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "CREATE TABLE journal (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id TEXT NOT NULL, "
+            "created_at TEXT NOT NULL, timezone TEXT, content TEXT NOT NULL)"
+        )
+        conn.executemany("INSERT INTO journal (user_id, created_at, timezone, content) VALUES (?, ?, ?, ?)", rows)
+    conn.close()
+
+
+OLD_ROWS = [
+    ("u1", "2025-01-05T09:00:00+00:00", "UTC", "first"),
+    ("u2", "2025-01-06 10:30:00+0100", "CET", "second"),
+    ("u1", "last tuesday", "UTC", "unparseable"),
+]
+
+
+def test_old_database_is_migrated_once(tmp_path, monkeypatch):
+    path = tmp_path / "journal.db"
+    _old_database(path, OLD_ROWS)
+
+    with JournalStore(path) as store:
+        conn = store._conn
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        epochs = conn.execute("SELECT content, created_at_epoch FROM journal ORDER BY id").fetchall()
+        assert epochs == [("first", 1736067600), ("second", 1736155800), ("unparseable", None)]
+        assert conn.execute("SELECT id FROM journal_epoch_unparsed").fetchall() == [(3,)]
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {"idx_journal_user_epoch", "idx_journal_epoch"} <= indexes
+        assert store.count_entries("u1", None) == 2
+
+    # Reopening finds the schema current and runs nothing again
+    def rerun(conn, *args):
+        raise AssertionError("migration ran twice")
+
+    monkeypatch.setattr(journalLog, "MIGRATIONS", [step._replace(apply=rerun) for step in journalLog.MIGRATIONS])
+    with JournalStore(path) as store:
+        store.add_entry("u1", "third")
+        assert store.count_entries("u1", None) == 3
+        assert store._conn.execute("SELECT COUNT(*) FROM journal_epoch_unparsed").fetchone()[0] == 1
+
+
+def test_migrations_run_on_the_writer_thread(tmp_path, monkeypatch):
+    threads = []
+    migrate = journalLog._migrate
+
+    def recording_migrate(conn, *args, **kwargs):
+        threads.append(threading.current_thread().name)
+        return migrate(conn, *args, **kwargs)
+
+    monkeypatch.setattr(journalLog, "_migrate", recording_migrate)
+
+    async def main():
+        store = AsyncJournalStore(tmp_path / "journal.db")
+        try:
+            await store.wait_ready()
+            await store.add_entry("u1", "hello")
+            return await store.count_entries("u1", None)
+        finally:
+            await asyncio.to_thread(store.close)
+
+    assert asyncio.run(main()) == 1
+    assert threads == ["journal-writer"]
+    with sqlite3.connect(tmp_path / "journal.db") as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+
+
+def test_failed_open_is_raised_to_callers(tmp_path):
+    # A directory can't be opened as a database
+    async def main():
+        store = AsyncJournalStore(tmp_path)
+        try:
+            with pytest.raises(sqlite3.Error):
+                await store.wait_ready()
+            with pytest.raises(sqlite3.Error):
+                await store.add_entry("u1", "lost")
+            with pytest.raises(sqlite3.Error):
+                await store.count_entries("u1", None)
+        finally:
+            await asyncio.to_thread(store.close)
+
+    asyncio.run(main())
+
+
+def test_interrupted_backfill_resumes_where_it_stopped(tmp_path, monkeypatch):
+    path = tmp_path / "journal.db"
+    _old_database(path, [("u1", f"2025-01-05T09:{i:02d}:00+00:00", "UTC", f"entry {i}") for i in range(50)])
+    monkeypatch.setattr(journalLog, "BACKFILL_CHUNK", 10)
+    parse = journalLog._parse_created_at
+    parsed = []
+
+    def crashing_parse(created_at):
+        if len(parsed) == 25:
+            raise RuntimeError("killed mid-chunk")
+        parsed.append(created_at)
+        return parse(created_at)
+
+    monkeypatch.setattr(journalLog, "_parse_created_at", crashing_parse)
+    with pytest.raises(RuntimeError):
+        JournalStore(path)
+    with sqlite3.connect(path) as conn:
+        # Two whole chunks were committed; the third was lost with the crash
+        assert conn.execute("SELECT last_id FROM migration_progress").fetchone() == (20,)
+        assert conn.execute("SELECT COUNT(*) FROM journal WHERE created_at_epoch IS NOT NULL").fetchone() == (20,)
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION - 1
+    conn.close()
+
+    parsed.clear()
+    monkeypatch.setattr(journalLog, "_parse_created_at", lambda created_at: parsed.append(created_at) or parse(created_at))
+    with JournalStore(path) as store:
+        assert store._conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        assert store._conn.execute("SELECT COUNT(*) FROM journal WHERE created_at_epoch IS NULL").fetchone() == (0,)
+    # Only the rows after the saved position were parsed again
+    assert parsed == [f"2025-01-05T09:{i:02d}:00+00:00" for i in range(20, 50)]
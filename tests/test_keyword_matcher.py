@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+from keywordMatcher import KeywordMatcher, describe_hits
+
+
+def _naive_hits(groups, text):
+    # What the per-keyword `kw.lower() in title.lower()` loops did
+    return {str(i): {kw for kw in group if kw.lower() in text.lower()} for i, group in enumerate(groups)}
+
+
+def test_overlapping_and_suffix_keywords_are_all_reported():
+    matcher = KeywordMatcher([["he", "she", "hers", "his"]])
+    assert matcher.hits("USHERS")["0"] == {"he", "she", "hers"}
+
+
+def test_groups_are_anded():
+    matcher = KeywordMatcher([["rtx", "gpu"], ["usa", "paypal"]], names=["keywords", "other"])
+    assert matcher.match("[USA-CA] [H] RTX 3080 [W] PayPal") == {"keywords": {"rtx"}, "other": {"usa", "paypal"}}
+    assert matcher.match("[EU-DE] [H] RTX 3080 [W] Cash") is None
+
+
+def test_keywords_keep_their_configured_case():
+    matcher = KeywordMatcher([["RTX 4090"]])
+    assert describe_hits(matcher.match("rtx 4090 founders")) == "RTX 4090"
+
+
+def test_empty_keyword_matches_every_title():
+    matcher = KeywordMatcher([["gpu"], [""]])
+    assert matcher.match("new gpu") == {"0": {"gpu"}, "1": {""}}
+    assert describe_hits(matcher.match("new gpu")) == "gpu"
+
+
+def test_names_must_line_up_with_groups():
+    with pytest.raises(ValueError):
+        KeywordMatcher([["a"], ["b"]], names=["only one"])
+
+
+def test_matches_naive_substring_search():
+    rng = random.Random(5)
+    alphabet = "abcab "
+    for _ in range(300):
+        groups = [
+            ["".join(rng.choice(alphabet) for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 4))]
+            for _ in range(rng.randint(1, 3))
+        ]
+        text = "".join(rng.choice(alphabet + "ABC") for _ in range(rng.randint(0, 30)))
+        assert KeywordMatcher(groups).hits(text) == _naive_hits(groups, text), (groups, text)
@@ -0,0 +1,70 @@
+import unicodedata
+
+import pytest
+
+from messageChunker import iter_chunks, split_text
+
+
+def _squash(text):
+    return "".join(text.split())
+
+
+def test_split_prefers_paragraphs_then_lines_then_words():
+    text = "a" * 30 + "\n\n" + "b" * 30 + "\n" + "c" * 30 + " " + "d" * 30
+    assert list(split_text(text, limit=70)) == ["a" * 30 + "\n\n" + "b" * 30, "c" * 30 + " " + "d" * 30]
+    assert list(split_text(text, limit=40)) == ["a" * 30, "b" * 30, "c" * 30, "d" * 30]
+
+
+def test_split_skips_boundaries_that_would_leave_a_tiny_fragment():
+    text = "ab " + "x" * 100
+    assert [len(piece) for piece in split_text(text, limit=50)] == [50, 50, 3]
+
+
+@pytest.mark.parametrize("limit", [5, 7, 13, 50])
+def test_split_never_separates_combining_marks(limit):
+    # "é" spelled as e + COMBINING ACUTE ACCENT, with no spaces to break on
+    text = "é" * 40
+    pieces = list(split_text(text, limit))
+    assert all(0 < len(piece) <= limit for piece in pieces)
+    assert not any(unicodedata.combining(piece[0]) for piece in pieces)
+    assert "".join(pieces) == text
+
+
+def test_split_keeps_all_text_within_the_limit():
+    text = " ".join(f"word{i}" + "\n" * (i % 3) for i in range(500))
+    pieces = list(split_text(text, limit=97))
+    assert all(len(piece) <= 97 for piece in pieces)
+    assert _squash("".join(pieces)) == _squash(text)
+
+
+def test_chunks_pack_parts_up_to_the_limit():
+    parts = ["x" * 40, "y" * 40, "z" * 40]
+    assert list(iter_chunks(parts, limit=90, separator="--")) == ["x" * 40 + "--" + "y" * 40, "z" * 40]
+    assert list(iter_chunks(["", "a", ""], limit=10)) == ["a"]
+    assert list(iter_chunks([], limit=10)) == []
+
+
+def test_chunks_split_oversized_parts():
+    chunks = list(iter_chunks(["short", "w " * 100], limit=50))
+    assert all(len(chunk) <= 50 for chunk in chunks)
+    assert _squash("".join(chunks)) == _squash("short" + "w " * 100)
+
+
+def test_tail_is_appended_when_it_fits_and_sent_alone_otherwise():
+    assert list(iter_chunks(["a" * 5], limit=10, tail="...")) == ["a" * 5 + "..."]
+    assert list(iter_chunks(["a" * 9], limit=10, tail="...")) == ["a" * 9, "..."]
+    assert list(iter_chunks([], limit=10, tail="(none)")) == ["(none)"]
+
+
+def test_chunks_are_yielded_before_the_input_ends():
+    consumed = []
+
+    def parts():
+        for i in range(10):
+            consumed.append(i)
+            yield "p" * 8
+
+    chunks = iter_chunks(parts(), limit=20, separator=" ")
+    assert next(chunks) == "p" * 8 + " " + "p" * 8
+    # Only the part that overflowed the first chunk has been read past it
+    assert consumed == [0, 1, 2]
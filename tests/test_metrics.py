@@ -0,0 +1,89 @@
+import asyncio
+
+import aiohttp
+import pytest
+
+from metrics import MetricsRegistry, start_metrics_server, summary_lines
+
+
+def test_render_prometheus_text_format():
+    registry = MetricsRegistry()
+    registry.counter("fetch_total", "Fetches", watcher='say "hi"\n').inc(3)
+    registry.gauge("queue_depth").set(2.5)
+    hist = registry.histogram("op_seconds", "Op latency", buckets=(0.1, 1.0), op="get")
+    for value in (0.05, 0.5, 0.5, 3.0):
+        hist.observe(value)
+
+    assert registry.render_prometheus().splitlines() == [
+        "# HELP fetch_total Fetches",
+        "# TYPE fetch_total counter",
+        'fetch_total{watcher="say \\"hi\\"\\n"} 3',
+        "# HELP op_seconds Op latency",
+        "# TYPE op_seconds histogram",
+        'op_seconds_bucket{op="get",le="0.1"} 1',
+        'op_seconds_bucket{op="get",le="1"} 3',
+        'op_seconds_bucket{op="get",le="+Inf"} 4',
+        'op_seconds_sum{op="get"} 4.05',
+        'op_seconds_count{op="get"} 4',
+        "# TYPE queue_depth gauge",
+        "queue_depth 2.5",
+    ]
+
+
+def test_histogram_quantile_is_a_bucket_bound():
+    hist = MetricsRegistry().histogram("h", buckets=(0.01, 0.1, 1.0))
+    assert hist.quantile(0.5) is None
+    for value in (0.005, 0.05, 0.05, 0.5, 5.0):
+        hist.observe(value)
+    assert hist.quantile(0.5) == 0.1
+    assert hist.quantile(0.8) == 1.0
+    assert hist.quantile(1.0) == float("inf")
+
+
+def test_a_name_keeps_its_kind():
+    registry = MetricsRegistry()
+    registry.counter("things_total").inc()
+    with pytest.raises(ValueError):
+        registry.gauge("things_total")
+    with pytest.raises(ValueError):
+        registry.histogram("things_total", watcher="new")
+    assert [labels for labels, _ in registry.series("things_total")] == [{}]
+
+
+def test_summary_lines():
+    registry = MetricsRegistry()
+    assert summary_lines(registry) == ["No metrics recorded yet."]
+
+    registry.histogram("watcher_run_seconds", watcher="pid").observe(0.2)
+    registry.histogram("fetch_seconds", watcher="pid").observe(0.004)
+    registry.counter("watcher_errors_total", watcher="pid", kind="TimeoutError").inc()
+    registry.counter("watcher_alerts_total", watcher="pid").inc(2)
+    registry.histogram("journal_op_seconds", op="get_page").observe(0.0008)
+    registry.histogram("discord_send_seconds", channel=1).observe(0.3)
+    registry.histogram("discord_send_seconds", channel=2).observe(0.03)
+    registry.counter("notifier_failures_total", reason="queue_full").inc()
+
+    assert summary_lines(registry) == [
+        "Watchers (runs, errors, p50/p95 run, p95 fetch, alerts, dedup hits, drift p95):",
+        "  pid: 1 runs, 1 err, 250ms/250ms, fetch 5.0ms, 2 alerts, 0 dedup, drift -",
+        "Journal (calls, p50/p99):",
+        "  get_page: 1, 1.0ms/1.0ms",
+        "Discord sends: 2, p50/p95 50ms/500ms, 1 failed",
+    ]
+
+
+def test_metrics_endpoint_serves_the_registry():
+    registry = MetricsRegistry()
+    registry.counter("hits_total").inc()
+
+    async def main():
+        runner = await start_metrics_server(0, registry=registry)
+        try:
+            host, port = runner.addresses[0][:2]
+            async with aiohttp.ClientSession() as session:
+                async with session.get(f"http://{host}:{port}/metrics") as resp:
+                    return resp.status, await resp.text()
+        finally:
+            await runner.cleanup()
+
+    assert asyncio.run(main()) == (200, registry.render_prometheus())
@@ -0,0 +1,74 @@
+import asyncio
+
+from messageChunker import MAX_MESSAGE_LEN
+from notifier import Notification, Notifier, pack_with_progress
+from watchers import WatcherDef, WatcherScheduler, _changed, RunContext
+
+
+class FlakyChannel:
+    id = 1
+
+    def __init__(self, fail_on):
+        self.fail_on = fail_on
+        self.sent = []
+
+    async def send(self, content):
+        if len(self.sent) + 1 == self.fail_on:
+            raise ConnectionError("send failed")
+        self.sent.append(content)
+
+
+class FakeBot:
+    def __init__(self, channel):
+        self.channel = channel
+
+    def get_channel(self, channel_id):
+        return self.channel
+
+
+def test_pack_with_progress_counts_only_complete_messages():
+    big = "x" * (MAX_MESSAGE_LEN - 100)
+    long_message = "word " * MAX_MESSAGE_LEN  # split across several chunks
+    packed = pack_with_progress(["a", big, long_message, "b"])
+    complete = [n for _, n in packed]
+    assert complete == sorted(complete)
+    assert complete[0] == 2  # "a" and big share the first chunk
+    assert complete[-1] == 4
+    # Chunks holding only part of long_message leave it incomplete; the one
+    # with its final piece completes it
+    assert complete.count(3) == 1
+    assert complete.count(2) == len(packed) - 2
+
+
+def test_failed_send_only_rolls_back_unsent_items():
+    channel = FlakyChannel(fail_on=2)
+    notifier = Notifier(FakeBot(channel), coalesce_window=0, bucket_capacity=10)
+    big = "y" * (MAX_MESSAGE_LEN - 10)  # one chunk per item
+    failed = []
+    items = [
+        Notification(1, [big], f"item{i}", on_failed=lambda i=i: failed.append(i))
+        for i in range(3)
+    ]
+    asyncio.run(notifier._deliver(1, items))
+    assert len(channel.sent) == 1
+    assert failed == [1, 2]
+
+
+def test_changed_alert_is_retried_after_failed_delivery():
+    watcher = WatcherDef(name="price", extractor="fish_price", predicate="changed", options={"initial": 10})
+    scheduler = WatcherScheduler(None, [], fetcher=None)
+    scheduler.state[watcher.name] = state = {}
+    ctx = RunContext(watcher, state, None, None)
+
+    alerts = _changed(ctx, 12)
+    undo_state = alerts[0]["undo_state"]
+    scheduler._rollback(watcher, [], undo_state)()
+    # The change is seen again on the next run
+    retried = _changed(ctx, 12)
+    assert retried[0]["previous"] == 10
+
+    # A rollback arriving after a later run moved on leaves that run's value alone
+    rollback = scheduler._rollback(watcher, [], retried[0]["undo_state"])
+    _changed(ctx, 15)
+    rollback()
+    assert state["last"] == 15
@@ -0,0 +1,26 @@
+import asyncio
+
+import scrapers
+from parsePool import ParsePool
+from watchers import _select_parser
+
+PAGE = (
+    '<html><body><div class="col-xs-12 padding-v-10">Model: PID-100</div>'
+    '<div class="col-xs-12 padding-v-10"><strong>Availability:</strong> In Stock</div>'
+    '<span class="price">$12.99</span></body></html>'
+).encode()
+
+
+def test_parsers_run_in_worker_processes():
+    async def main():
+        pool = ParsePool(workers=1, inline_below=0)
+        try:
+            assert pool._context.get_start_method() != "fork"
+            return (
+                await pool.parse(scrapers.parse_pid, PAGE),
+                await pool.parse(_select_parser("span.price", "text"), PAGE, "utf-8"),
+            )
+        finally:
+            await pool.close()
+
+    assert asyncio.run(main()) == (True, "$12.99")
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import redditEngine
+from fetchEngine import FetchEngine
+from redditEngine import RedditEngine, _keyword_groups, parse_source
+from redditSource import CursorStore
+
+
+class FakeReddit:
+    # Serves /r/a+b/new.json: newest first across the named subreddits, `before`
+    # returning only posts newer than the given fullname
+    def __init__(self):
+        self.posts = []
+        self._next_id = 0
+
+    def publish(self, subreddit, *titles):
+        for title in titles:
+            self._next_id += 1
+            self.posts.insert(0, {"name": f"t3_{self._next_id:x}", "title": title, "subreddit": subreddit})
+
+    async def handle(self, request):
+        names = request.match_info["names"].lower().split("+")
+        posts = [post for post in self.posts if post["subreddit"].lower() in names]
+        before = request.query.get("before")
+        if before:
+            fullnames = [post["name"] for post in posts]
+            posts = posts[: fullnames.index(before)] if before in fullnames else []
+        posts = posts[: int(request.query.get("limit", 25))]
+        children = [{"data": {**post, "permalink": f"/r/{post['subreddit']}/comments/{post['name']}/"}} for post in posts]
+        return web.json_response({"data": {"children": children}})
+
+
+def _sources(*names):
+    return [{"subreddit": name, "keywords": ["gpu"]} for name in names]
+
+
+def test_blank_keywords_and_groups_are_dropped():
+    assert _keyword_groups(["gpu,cpu,", "", [" ", "rtx"]]) == [["gpu", "cpu"], ["rtx"]]
+
+
+def test_trailing_comma_does_not_match_every_title():
+    _, _, rule = parse_source({"subreddit": "hardwareswap", "keywords": ["gpu,cpu,"]})
+    posts = [{"title": "Selling a GPU", "link": "/1"}, {"title": "Selling a chair", "link": "/2"}]
+    assert [post["link"] for post in rule.apply(posts)] == ["/1"]
+
+
+@pytest.mark.parametrize("keywords", [None, [], [""], ["", " , "]])
+def test_source_without_keywords_is_rejected(keywords):
+    with pytest.raises(ValueError):
+        parse_source({"subreddit": "hardwareswap", "keywords": keywords})
+
+
+def test_changed_batches_do_not_replay_old_posts(tmp_path, monkeypatch):
+    reddit = FakeReddit()
+    reddit.publish("a", "a gpu 1")
+    reddit.publish("b", "b gpu 1")
+    reddit.publish("c", "c gpu 1")
+
+    async def main():
+        app = web.Application()
+        app.router.add_get("/r/{names}/new.json", reddit.handle)
+        server = TestServer(app)
+        await server.start_server()
+        monkeypatch.setattr(redditEngine, "REDDIT_BASE_URL", str(server.make_url("")).rstrip("/"))
+        monkeypatch.setattr(redditEngine, "MAX_SUBREDDITS_PER_LISTING", 2)
+        fetcher = FetchEngine()
+        cursors = CursorStore(tmp_path / "alerts.db")
+        try:
+            engine = RedditEngine(_sources("b", "c"), cursors=cursors)
+            first = [post["title"] for post in await engine.fetch_new(fetcher)]
+            assert sorted(first) == ["b gpu 1", "c gpu 1"]
+
+            # Adding "a" shifts "c" into a new batch, and "b" into a new URL
+            reddit.publish("c", "c gpu 2")
+            engine = RedditEngine(_sources("a", "b", "c"), cursors=cursors)
+            assert [listing.source.url.rsplit("/r/", 1)[1] for listing in engine.listings] == ["a+b/new.json", "c/new.json"]
+            titles = [post["title"] for post in await engine.fetch_new(fetcher)]
+            # Only "a" (never polled) and the new "c" post; old b/c posts stay quiet
+            assert sorted(titles) == ["a gpu 1", "c gpu 2"]
+            assert await engine.fetch_new(fetcher) == []
+        finally:
+            cursors.close()
+            await fetcher.close()
+            await server.close()
+
+    asyncio.run(main())
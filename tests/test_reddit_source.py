@@ -0,0 +1,135 @@
+import asyncio
+import sqlite3
+import threading
+
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from fetchEngine import FetchEngine
+from redditSource import CursorStore, RedditListingSource
+
+
+class FakeSubreddit:
+    # Serves /r/<name>/new.json like Reddit: newest first, `before` returns only
+    # posts newer than the given fullname (nothing if that post is gone)
+    def __init__(self):
+        self.posts = []
+        self.requests = []
+        self._next_id = 0
+
+    def publish(self, *titles):
+        for title in titles:
+            self._next_id += 1
+            self.posts.insert(0, {"name": f"t3_{self._next_id}", "title": title, "subreddit": "test"})
+
+    def delete(self, fullname):
+        self.posts = [post for post in self.posts if post["name"] != fullname]
+
+    async def handle(self, request):
+        self.requests.append(dict(request.query))
+        limit = int(request.query.get("limit", 25))
+        posts = self.posts
+        before = request.query.get("before")
+        if before:
+            names = [post["name"] for post in posts]
+            posts = posts[: names.index(before)] if before in names else []
+        children = [{"data": {**post, "permalink": f"/r/test/comments/{post['name']}/"}} for post in posts[-limit:]]
+        return web.json_response({"data": {"children": children}})
+
+
+def _run(subreddit, scenario):
+    async def main():
+        app = web.Application()
+        app.router.add_get("/r/test/new.json", subreddit.handle)
+        server = TestServer(app)
+        await server.start_server()
+        fetcher = FetchEngine()
+        try:
+            return await scenario(str(server.make_url("/r/test")), fetcher)
+        finally:
+            await fetcher.close()
+            await server.close()
+
+    return asyncio.run(main())
+
+
+def _titles(posts):
+    return [post["title"] for post in posts]
+
+
+def test_before_cursor_only_returns_new_posts():
+    subreddit = FakeSubreddit()
+    subreddit.publish("one", "two")
+
+    async def scenario(url, fetcher):
+        source = RedditListingSource(url)
+        assert _titles(await source.fetch_new(fetcher)) == ["two", "one"]
+        assert source.cursor == "t3_2"
+        assert await source.fetch_new(fetcher) == []
+        subreddit.publish("three", "four")
+        assert _titles(await source.fetch_new(fetcher)) == ["four", "three"]
+        assert source.cursor == "t3_4"
+
+    _run(subreddit, scenario)
+    assert [r.get("before") for r in subreddit.requests] == [None, "t3_2", "t3_2"]
+
+
+def test_cursor_survives_restart(tmp_path):
+    subreddit = FakeSubreddit()
+    subreddit.publish("old")
+    store_path = tmp_path / "alerts.db"
+
+    async def scenario(url, fetcher):
+        cursors = CursorStore(store_path)
+        await RedditListingSource(url, cursors=cursors).fetch_new(fetcher)
+        cursors.close()
+
+        subreddit.publish("new")
+        cursors = CursorStore(store_path)
+        try:
+            restarted = RedditListingSource(url, cursors=cursors)
+            assert restarted.cursor == "t3_1"
+            assert _titles(await restarted.fetch_new(fetcher)) == ["new"]
+        finally:
+            cursors.close()
+
+    _run(subreddit, scenario)
+
+
+def test_deleted_cursor_post_is_recovered():
+    subreddit = FakeSubreddit()
+    subreddit.publish("one", "two")
+
+    async def scenario(url, fetcher):
+        source = RedditListingSource(url, verify_every=2)
+        await source.fetch_new(fetcher)
+        subreddit.delete("t3_2")
+        subreddit.publish("three")
+        # `before` a deleted post returns nothing, however much is new
+        assert await source.fetch_new(fetcher) == []
+        # The verify poll notices the cursor is gone and resumes from the newest post
+        assert _titles(await source.fetch_new(fetcher)) == ["three", "one"]
+        assert source.cursor == "t3_3"
+        subreddit.publish("four")
+        assert _titles(await source.fetch_new(fetcher)) == ["four"]
+
+    _run(subreddit, scenario)
+
+
+def test_cursor_writes_are_committed_off_the_calling_thread(tmp_path, monkeypatch):
+    writes = []
+    connect = sqlite3.connect
+
+    def tracing_connect(*args, **kwargs):
+        conn = connect(*args, **kwargs)
+        conn.set_trace_callback(
+            lambda sql: sql.startswith("INSERT") and writes.append(threading.current_thread().name)
+        )
+        return conn
+
+    monkeypatch.setattr(sqlite3, "connect", tracing_connect)
+    cursors = CursorStore(tmp_path / "alerts.db")
+    cursors.set("https://www.reddit.com/r/test/new.json", "t3_1")
+    assert cursors.get("https://www.reddit.com/r/test/new.json") == "t3_1"
+    cursors.close()
+    assert writes == ["cursor-writer"]
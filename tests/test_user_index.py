@@ -0,0 +1,59 @@
+import random
+
+from journalLog import UserIndex
+
+
+def _naive_search(ids, names, prefix, limit=25):
+    found = [uid for uid in sorted(ids) if uid.startswith(prefix)]
+    if prefix:
+        by_name = sorted((name.casefold(), uid) for uid, name in names.items())
+        found += [uid for key, uid in by_name if key.startswith(prefix.casefold()) and uid not in found]
+    return found[:limit]
+
+
+def test_ids_first_then_case_insensitive_names():
+    index = UserIndex()
+    index.load(["1234", "1299", "5678"], {"5678": "Alice", "1299": "alfred"})
+    assert index.search("12") == ["1234", "1299"]
+    assert index.search("AL") == ["1299", "5678"]
+    assert index.search("") == ["1234", "1299", "5678"]
+    assert index.search("12", limit=1) == ["1234"]
+    assert index.search("zz") == []
+
+
+def test_renames_replace_the_old_name():
+    index = UserIndex()
+    index.load(["1"], {"1": "Bob"})
+    index.set_name("1", "Carol")
+    assert index.search("bob") == []
+    assert index.search("car") == ["1"]
+    assert index.name("1") == "Carol"
+    # A case-only change keeps one entry
+    index.set_name("1", "CAROL")
+    assert index.search("carol") == ["1"] and index.name("1") == "CAROL"
+
+
+def test_load_keeps_what_was_added_while_it_read():
+    index = UserIndex()
+    index.add_id("42")
+    index.set_name("42", "new name")
+    index.load(["7"], {"7": "seven", "42": "stale name"})
+    assert len(index) == 2
+    assert index.search("new") == ["42"] and index.search("stale") == []
+
+
+def test_matches_a_naive_scan_under_random_updates():
+    rng = random.Random(17)
+    index = UserIndex()
+    ids, names = set(), {}
+    for _ in range(500):
+        user_id = str(rng.randrange(300))
+        if rng.random() < 0.5:
+            index.add_id(user_id)
+            ids.add(user_id)
+        else:
+            name = "".join(rng.choice("aAbB") for _ in range(rng.randint(1, 4)))
+            index.set_name(user_id, name)
+            names[user_id] = name
+        prefix = rng.choice(["", "1", "2", "a", "B", "ab", "1a"])
+        assert index.search(prefix, limit=10) == _naive_search(ids, names, prefix, limit=10)
@@ -0,0 +1,53 @@
+import asyncio
+
+from journalLog import NAME_MISS_TTL, UserNameResolver
+
+
+class FakeUser:
+    def __init__(self, name):
+        self.name = name
+
+    def __str__(self):
+        return self.name
+
+
+class FakeBot:
+    def __init__(self, known):
+        self.known = known
+        self.fetches = []
+
+    def get_user(self, user_id):
+        return None
+
+    async def fetch_user(self, user_id):
+        self.fetches.append(user_id)
+        if user_id not in self.known:
+            raise LookupError("Unknown User")
+        return FakeUser(self.known[user_id])
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_unknown_ids_are_cached_briefly():
+    bot = FakeBot({1: "alice"})
+    clock = Clock()
+    resolver = UserNameResolver(bot, clock=clock)
+
+    async def main():
+        assert await resolver.resolve_many(["1", "2"]) == {"1": "alice", "2": "2"}
+        assert await resolver.resolve_many(["1", "2"]) == {"1": "alice", "2": "2"}
+        assert sorted(bot.fetches) == [1, 2]
+
+        # The miss expires long before the name does
+        clock.now += NAME_MISS_TTL + 1
+        assert await resolver.resolve("2") is None
+        assert await resolver.resolve("1") == "alice"
+        assert sorted(bot.fetches) == [1, 2, 2]
+
+    asyncio.run(main())
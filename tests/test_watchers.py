@@ -0,0 +1,135 @@
+import asyncio
+import heapq
+import json
+from pathlib import Path
+
+import pytest
+
+from fetchEngine import RateLimitedError
+from watchers import EXTRACTORS, PREDICATES, WatcherDef, WatcherScheduler, load_watchers, render_message
+
+SCRIPTS = {}
+
+
+async def _scripted(ctx):
+    # Next scripted outcome for this watcher: a value, or an exception to raise,
+    # optionally after a (delay, outcome) pause standing in for a slow fetch
+    outcome = SCRIPTS[ctx.watcher.name].pop(0)
+    if isinstance(outcome, tuple):
+        delay, outcome = outcome
+        await asyncio.sleep(delay)
+    if isinstance(outcome, BaseException):
+        raise outcome
+    return outcome
+
+
+EXTRACTORS["test_scripted"] = _scripted
+PREDICATES["test_never"] = lambda ctx, value: []
+
+
+def _scheduler(watcher):
+    scheduler = WatcherScheduler(None, [watcher], fetcher=None, jitter=0)
+    scheduler._semaphore = asyncio.Semaphore(1)
+    return scheduler
+
+
+async def _delays(scheduler, watcher, outcomes):
+    # Delay before the next run, after each scripted run
+    SCRIPTS[watcher.name] = list(outcomes)
+    loop = asyncio.get_running_loop()
+    delays = []
+    for _ in outcomes:
+        due = loop.time()
+        await scheduler._dispatch(watcher, due)
+        next_due, _, _ = heapq.heappop(scheduler._heap)
+        delays.append(round(next_due - due))
+    return delays
+
+
+def _rate_limited(retry_after):
+    return RateLimitedError("https://example.test", 429, retry_after)
+
+
+@pytest.mark.parametrize("adaptive", [False, True])
+def test_retry_after_only_delays_the_next_run(adaptive):
+    watcher = WatcherDef(name=f"fixed-{adaptive}", extractor="test_scripted", predicate="test_never", interval=60)
+    if adaptive:
+        watcher.adaptive, watcher.min_interval, watcher.max_interval = True, 60, 60
+    scheduler = _scheduler(watcher)
+    delays = asyncio.run(_delays(scheduler, watcher, [1, _rate_limited(3600), 1, 1]))
+    assert delays == [60, 3600, 60, 60]
+    assert scheduler.current_interval(watcher) == 60
+
+
+def test_adaptive_interval_recovers_after_rate_limit():
+    watcher = WatcherDef(
+        name="adaptive",
+        extractor="test_scripted",
+        predicate="test_never",
+        interval=20,
+        adaptive=True,
+        min_interval=20,
+        max_interval=300,
+    )
+    scheduler = _scheduler(watcher)
+    outcomes = [
+        "a",  # first run: activity unknown, keep the base
+        "a",  # quiet: back off
+        _rate_limited(3600),  # honour Retry-After once, base untouched
+        "a",  # quiet again: continue from the pre-429 base
+        "b",  # changed: snap back to min_interval
+    ]
+    delays = asyncio.run(_delays(scheduler, watcher, outcomes))
+    assert delays == [20, 40, 3600, 80, 20]
+    assert scheduler.current_interval(watcher) == 20
+
+
+def test_retry_after_counts_from_when_the_429_arrived():
+    watcher = WatcherDef(name="slow", extractor="test_scripted", predicate="test_never", interval=0.1)
+    scheduler = _scheduler(watcher)
+
+    async def main():
+        # The fetch takes 0.3s before the server answers 429 with Retry-After: 0.5
+        SCRIPTS[watcher.name] = [(0.3, _rate_limited(0.5))]
+        loop = asyncio.get_running_loop()
+        await scheduler._dispatch(watcher, loop.time())
+        arrived = loop.time()
+        next_due, _, _ = heapq.heappop(scheduler._heap)
+        return next_due - arrived
+
+    assert asyncio.run(main()) == pytest.approx(0.5, abs=0.05)
+
+
+def test_load_watchers_expands_env_and_merges_defaults(tmp_path, monkeypatch):
+    monkeypatch.setenv("SHOP_URL", "https://shop.test/item")
+    monkeypatch.setenv("CHANNEL", "1234")
+    monkeypatch.delenv("UNSET_MENTION", raising=False)
+    config = tmp_path / "watchers.json"
+    config.write_text(json.dumps({
+        "defaults": {"interval": "600", "channel_id": "${CHANNEL}", "mention": "${UNSET_MENTION}"},
+        "watchers": [
+            {"name": "shop", "extractor": "select_text", "url": "${SHOP_URL}", "selector": "span.price"},
+            {"name": "other", "extractor": "pid", "channel_id": "", "interval": 60, "options": {"initial": 1}},
+        ],
+    }), encoding="utf-8")
+
+    shop, other = load_watchers(config)
+    assert shop.url == "https://shop.test/item"
+    assert shop.channel_id == 1234 and shop.interval == 600.0
+    # An unset variable expands to "", and unknown keys become options
+    assert shop.mention == ""
+    assert shop.options == {"selector": "span.price"}
+    assert other.channel_id is None and other.interval == 60.0
+    assert other.options == {"initial": 1}
+
+
+def test_shipped_config_loads():
+    watchers = load_watchers(Path(__file__).resolve().parent.parent / "watchers.json")
+    names = [w.name for w in watchers]
+    assert names and len(names) == len(set(names))
+    assert all(w.extractor and w.interval > 0 for w in watchers)
+
+
+def test_render_message_leaves_missing_fields_blank():
+    watcher = WatcherDef(name="price", extractor="fish_price", url="https://shop.test", template="{mention}{name}: {value} {missing}")
+    assert render_message(watcher, {"value": 12}) == "price: 12 "
@@ -0,0 +1,407 @@
+import asyncio
+import functools
+import heapq
+import itertools
+import json
+import os
+import random
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+from bs4 import BeautifulSoup
+
+from fetchEngine import RateLimitedError
+from metrics import DRIFT_BUCKETS, METRICS, current_watcher
+from notifier import Notification
+
+# Declarative watcher definitions and the single scheduler that drives them.
+# A watcher is: fetch something (extractor), decide what to alert on (predicate),
+# then render a message template for each alert into a Discord channel.
+
+DEFAULT_CONFIG_PATH = "watchers.json"
+DEFAULT_TEMPLATE = "{mention} \n{name} \nLink: {url}"
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_JITTER = 0.1
+DEFAULT_BACKOFF = 2.0
+DEFAULT_MAX_INTERVAL_FACTOR = 8
+STARTUP_SPREAD = 5.0
+
+_ENV_PATTERN = re.compile(r"\$\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
+
+@dataclass
+class WatcherDef:
+    name: str
+    extractor: str
+    url: Optional[str] = None
+    predicate: str = "truthy"
+    interval: float = 3600
+    mention: str = ""
+    template: str = DEFAULT_TEMPLATE
+    channel_id: Optional[int] = None
+    enabled: bool = True
+    # Adaptive polling: back off towards max_interval while quiet, snap to
+    # min_interval when the extracted value changes
+    adaptive: bool = False
+    min_interval: Optional[float] = None
+    max_interval: Optional[float] = None
+    backoff: float = DEFAULT_BACKOFF
+    # Extra parameters for the extractor/predicate (selector, initial value, ...)
+    options: Dict[str, Any] = field(default_factory=dict)
+
+
+class RunContext(NamedTuple):
+    watcher: WatcherDef
+    state: Dict[str, Any]
+    fetcher: Any
+    dedup: Any
+
+
+Extractor = Callable[[RunContext], Awaitable[Any]]
+Predicate = Callable[[RunContext, Any], List[Dict[str, Any]]]
+
+EXTRACTORS: Dict[str, Extractor] = {}
+PREDICATES: Dict[str, Predicate] = {}
+
+
+def extractor(name: str):
+    def register(fn: Extractor) -> Extractor:
+        EXTRACTORS[name] = fn
+        return fn
+    return register
+
+
+def predicate(name: str):
+    def register(fn: Predicate) -> Predicate:
+        PREDICATES[name] = fn
+        return fn
+    return register
+
+
+def _expand_env(value: Any) -> Any:
+    # ${VAR} placeholders let the config file reuse the existing .env settings
+    if isinstance(value, str):
+        return _ENV_PATTERN.sub(lambda m: os.getenv(m.group(1), ""), value)
+    if isinstance(value, list):
+        return [_expand_env(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _expand_env(v) for k, v in value.items()}
+    return value
+
+
+def load_watchers(path=DEFAULT_CONFIG_PATH) -> List[WatcherDef]:
+    with open(path, "r", encoding="utf-8") as fh:
+        raw = _expand_env(json.load(fh))
+    defaults = raw.get("defaults", {})
+    known = set(WatcherDef.__dataclass_fields__)
+    watchers = []
+    for entry in raw.get("watchers", []):
+        merged = {**defaults, **entry}
+        options = dict(merged.pop("options", {}))
+        # Unknown keys are treated as options so simple configs can stay flat
+        for key in [k for k in merged if k not in known]:
+            options[key] = merged.pop(key)
+        if merged.get("channel_id") not in (None, ""):
+            merged["channel_id"] = int(merged["channel_id"])
+        else:
+            merged["channel_id"] = None
+        merged["interval"] = float(merged.get("interval", 3600))
+        for key in ("min_interval", "max_interval"):
+            if merged.get(key) is not None:
+                merged[key] = float(merged[key])
+        watchers.append(WatcherDef(options=options, **merged))
+    return watchers
+
+
+class _SafeFormat(dict):
+    def __missing__(self, key):
+        return ""
+
+
+def render_message(watcher: WatcherDef, item: Dict[str, Any]) -> str:
+    values = _SafeFormat(name=watcher.name, url=watcher.url or "", mention=watcher.mention)
+    values.update(item)
+    return watcher.template.format_map(values)
+
+
+# ---- built-in predicates ----
+
+@predicate("truthy")
+def _truthy(ctx: RunContext, value: Any) -> List[Dict[str, Any]]:
+    return [{"value": value}] if value else []
+
+
+@predicate("changed")
+def _changed(ctx: RunContext, value: Any) -> List[Dict[str, Any]]:
+    if value is None:
+        return []
+    last = ctx.state.get("last", ctx.watcher.options.get("initial"))
+    if value == last:
+        return []
+    ctx.state["last"] = value
+    # If delivery fails, last goes back to previous so the change alerts again
+    return [{"value": value, "previous": last, "undo_state": {"last": (value, last)}}]
+
+
+@predicate("contains")
+def _contains(ctx: RunContext, value: Any) -> List[Dict[str, Any]]:
+    return [{"value": value}] if value is not None and ctx.watcher.options["text"] in value else []
+
+
+@predicate("not_contains")
+def _not_contains(ctx: RunContext, value: Any) -> List[Dict[str, Any]]:
+    return [{"value": value}] if value is not None and ctx.watcher.options["text"] not in value else []
+
+
+@predicate("new_posts")
+def _new_posts(ctx: RunContext, value: Any) -> List[Dict[str, Any]]:
+    alerts = []
+    for post in value or []:
+        if ctx.dedup is not None and post["link"] in ctx.dedup:
+            METRICS.counter("watcher_dedup_hits_total", "Posts skipped as already alerted", watcher=ctx.watcher.name).inc()
+            continue
+        alerts.append({**post, "dedup_key": post["link"]})
+    return alerts
+
+
+# ---- generic extractors (no code needed for simple product pages) ----
+
+def _select(html: str, selector: str, mode: str) -> Any:
+    node = BeautifulSoup(html, "html.parser").select_one(selector)
+    if mode == "exists":
+        return node is not None
+    return node.get_text(strip=True) if node is not None else None
+
+
+@functools.lru_cache(maxsize=None)
+def _select_parser(selector: str, mode: str) -> Callable[[str], Any]:
+    # Cached so FetchEngine.fetch_parsed sees a stable parser per selector; a
+    # partial (not a closure) so it can be sent to the parse pool
+    return functools.partial(_select, selector=selector, mode=mode)
+
+
+@extractor("select_text")
+async def _select_text(ctx: RunContext) -> Optional[str]:
+    parse = _select_parser(ctx.watcher.options["selector"], "text")
+    return await ctx.fetcher.fetch_parsed(ctx.watcher.url, parse, headers=ctx.watcher.options.get("headers"))
+
+
+@extractor("select_exists")
+async def _select_exists(ctx: RunContext) -> bool:
+    parse = _select_parser(ctx.watcher.options["selector"], "exists")
+    return await ctx.fetcher.fetch_parsed(ctx.watcher.url, parse, headers=ctx.watcher.options.get("headers"))
+
+
+@extractor("json_field")
+async def _json_field(ctx: RunContext) -> Any:
+    response = await ctx.fetcher.fetch(ctx.watcher.url)
+    if response.status != 200:
+        return None
+    value = response.json()
+    for key in ctx.watcher.options["field"].split("."):
+        value = value[key]
+    return value
+
+
+class WatcherScheduler:
+    # One coroutine drives every watcher from a min-heap of next-run times
+    def __init__(
+        self,
+        bot,
+        watchers: List[WatcherDef],
+        fetcher,
+        dedup=None,
+        notifier=None,
+        default_channel_id: Optional[int] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        jitter: float = DEFAULT_JITTER,
+    ):
+        self.bot = bot
+        self.fetcher = fetcher
+        self.dedup = dedup
+        self.notifier = notifier
+        self.default_channel_id = default_channel_id
+        self.jitter = jitter
+        self.watchers: List[WatcherDef] = []
+        for w in watchers:
+            if not w.enabled:
+                continue
+            if w.extractor not in EXTRACTORS:
+                raise ValueError(f"Watcher {w.name}: unknown extractor {w.extractor!r}")
+            if w.predicate not in PREDICATES:
+                raise ValueError(f"Watcher {w.name}: unknown predicate {w.predicate!r}")
+            self.watchers.append(w)
+        self.state: Dict[str, Dict[str, Any]] = {w.name: {} for w in self.watchers}
+        self.max_concurrency = max_concurrency
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+        # Loop-bound primitives are created in start(), inside the bot's loop
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running: Dict[str, asyncio.Task] = {}
+
+    @property
+    def started(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> asyncio.Task:
+        if not self.started:
+            loop = asyncio.get_running_loop()
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._wakeup = asyncio.Event()
+            self._heap.clear()
+            now = loop.time()
+            for w in self.watchers:
+                # Spread the first run a little so startup isn't one burst
+                self._push(now + random.uniform(0, min(w.interval, STARTUP_SPREAD)), w)
+            self._task = loop.create_task(self._run())
+        return self._task
+
+    async def stop(self) -> None:
+        tasks = list(self._running.values())
+        if self._task is not None:
+            tasks.append(self._task)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._task = None
+        self._running.clear()
+
+    def _push(self, due: float, w: WatcherDef) -> None:
+        heapq.heappush(self._heap, (due, next(self._seq), w))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _adapt_interval(self, w: WatcherDef, active: Optional[bool]) -> float:
+        # Only the adaptive base is kept between runs; a Retry-After never is
+        state = self.state[w.name]
+        interval = state.get("interval", w.interval)
+        if w.adaptive:
+            low = w.min_interval if w.min_interval is not None else w.interval
+            high = w.max_interval if w.max_interval is not None else w.interval * DEFAULT_MAX_INTERVAL_FACTOR
+            if active:
+                interval = low
+            elif active is not None:
+                interval = min(high, max(low, interval * w.backoff))
+        state["interval"] = interval
+        return interval
+
+    def _next_interval(self, w: WatcherDef, active: Optional[bool] = None) -> float:
+        interval = self._adapt_interval(w, active)
+        return max(0.0, interval * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    def current_interval(self, w: WatcherDef) -> float:
+        return self.state[w.name].get("interval", w.interval)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+            due = self._heap[0][0]
+            delay = due - loop.time()
+            if delay > 0:
+                try:
+                    # A finished watcher may push an earlier deadline; wake up for it
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            due, _, w = heapq.heappop(self._heap)
+            self._running[w.name] = loop.create_task(self._dispatch(w, due))
+
+    async def _dispatch(self, w: WatcherDef, due: float) -> None:
+        loop = asyncio.get_running_loop()
+        retry_after = None
+        # This task's own context: fetches below are labelled with the watcher
+        current_watcher.set(w.name)
+        try:
+            async with self._semaphore:
+                METRICS.histogram(
+                    "watcher_drift_seconds", "Start delay against the scheduled time", DRIFT_BUCKETS, watcher=w.name
+                ).observe(max(0.0, loop.time() - due))
+                with METRICS.timer("watcher_run_seconds", "Full watcher run: fetch, parse, predicate", watcher=w.name):
+                    await self.run_once(w)
+        except asyncio.CancelledError:
+            raise
+        except RateLimitedError as e:
+            retry_after = e.retry_after
+            METRICS.counter("watcher_errors_total", "Failed watcher runs", watcher=w.name, kind="rate_limited").inc()
+            print(f"Watcher {w.name} {e}")
+        except Exception as e:
+            METRICS.counter("watcher_errors_total", "Failed watcher runs", watcher=w.name, kind=type(e).__name__).inc()
+            print(f"Watcher {w.name} failed: {e}")
+        finally:
+            self._running.pop(w.name, None)
+        active = self.state[w.name].pop("active", None) if retry_after is None else None
+        # A rate-limited run leaves the base alone (active is None)
+        next_due = due + self._next_interval(w, active)
+        if retry_after is not None:
+            # Only this one delay honours Retry-After, counted from when the 429
+            # arrived: time spent queued or fetching doesn't come off it
+            self._push(max(loop.time() + retry_after, next_due), w)
+        else:
+            # Anchor to the scheduled time so runs don't drift; never schedule in the past
+            self._push(max(next_due, loop.time()), w)
+
+    def _channel_id(self, w: WatcherDef) -> Optional[int]:
+        return w.channel_id or self.default_channel_id
+
+    def _rollback(self, w: WatcherDef, keys: List[str], undo_state: Dict[str, tuple]) -> Optional[Callable[[], None]]:
+        # Undo what run_once committed to for alerts that were never delivered
+        if not keys and not undo_state:
+            return None
+
+        def undo() -> None:
+            for key in keys:
+                self.dedup.discard(key)
+            state = self.state[w.name]
+            for name, (current, previous) in undo_state.items():
+                # Unless a later run has already moved it on
+                if state.get(name) == current:
+                    state[name] = previous
+        return undo
+
+    async def run_once(self, w: WatcherDef) -> List[Dict[str, Any]]:
+        ctx = RunContext(w, self.state[w.name], self.fetcher, self.dedup)
+        value = await EXTRACTORS[w.extractor](ctx)
+        # Activity means the source changed since the previous run (unknown on the first)
+        if "prev_value" in ctx.state:
+            ctx.state["active"] = value != ctx.state["prev_value"]
+        ctx.state["prev_value"] = value
+        if isinstance(value, list):
+            METRICS.counter("watcher_matches_total", "Items the extractor matched", watcher=w.name).inc(len(value))
+        alerts = PREDICATES[w.predicate](ctx, value)
+        if not alerts:
+            return alerts
+        METRICS.counter("watcher_alerts_total", "Alerts queued for Discord", watcher=w.name).inc(len(alerts))
+        messages = [render_message(w, item) for item in alerts]
+        keys = [item["dedup_key"] for item in alerts if item.get("dedup_key")] if self.dedup is not None else []
+        # Mark as alerted up front so the next poll doesn't re-queue them while
+        # the send is pending; a failed delivery un-marks them
+        for key in keys:
+            self.dedup.add(key)
+        undo_state = {name: change for item in alerts for name, change in item.get("undo_state", {}).items()}
+        rollback = self._rollback(w, keys, undo_state)
+        if self.notifier is not None:
+            self.notifier.submit(Notification(self._channel_id(w), messages, w.name, rollback))
+            return alerts
+        channel = self.bot.get_channel(self._channel_id(w))
+        try:
+            for message in messages:
+                await channel.send(message)
+        except Exception:
+            if rollback is not None:
+                rollback()
+            raise
+        print(f"{w.name} Message Sent.")
+        return alerts
+
+
+def config_path() -> Path:
+    return Path(os.getenv("WATCHERS_CONFIG", DEFAULT_CONFIG_PATH))